@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import Literal
 
 class Settings(BaseSettings):
     # Application
@@ -18,6 +19,12 @@ class Settings(BaseSettings):
         "http://localhost:8080"
     ]
     
+    # Train ticks: "local" simulates in this process; "subscriber" fans out
+    # ticks from `python -m app.tick_publisher` (one simulator for all workers)
+    tick_mode: Literal["local", "subscriber"] = "local"
+    tick_socket_path: str = "/tmp/dmrc-ticks.sock"
+    fleet_shm_name: str = "dmrc-fleet"
+    
     # Data paths
     data_dir: Path = Path(__file__).parent.parent.parent / "data"
     processed_data_dir: Path = data_dir / "processed"
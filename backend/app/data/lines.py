@@ -0,0 +1,45 @@
+LINE_NAMES = ["Yellow", "Blue", "Violet", "Orange", "Aqua"]
+
+LINE_LENGTHS_KM = {
+    "Yellow": 45.7,
+    "Blue": 58.5,
+    "Violet": 47.0,
+    "Orange": 22.7,
+    "Aqua": 29.7
+}
+
+# (forward, backward) direction keys; forward means increasing distance_from_origin_km
+LINE_DIRECTIONS = {
+    "Yellow": ("towards_huda", "towards_samaypur"),
+    "Blue": ("towards_noida", "towards_dwarka"),
+    "Violet": ("towards_ballabhgarh", "towards_kashmere"),
+    "Orange": ("towards_airport", "towards_newdelhi"),
+    "Aqua": ("towards_greaternoida", "towards_sector51")
+}
+
+# Upper bound of the random running speed picked when a train departs
+LINE_MAX_SPEED_KMH = {
+    "Yellow": 40,
+    "Blue": 40,
+    "Violet": 40,
+    "Orange": 50,
+    "Aqua": 40
+}
+
+# Average running speed used for journey and ETA estimates
+LINE_AVG_SPEED_KMH = {
+    "Yellow": 35,
+    "Blue": 35,
+    "Violet": 35,
+    "Orange": 45,
+    "Aqua": 35
+}
+
+# Passenger-facing names for the (forward, backward) directions
+LINE_DIRECTION_NAMES = {
+    "Yellow": ("Towards HUDA City Centre", "Towards Samaypur Badli"),
+    "Blue": ("Towards Noida Electronic City", "Towards Dwarka Sector 21"),
+    "Violet": ("Towards Raja Nahar Singh (Ballabhgarh)", "Towards Kashmere Gate"),
+    "Orange": ("Towards IGI Airport Terminal 3", "Towards New Delhi"),
+    "Aqua": ("Towards Greater Noida (Depot Station)", "Towards Noida Sector 51")
+}
@@ -1,20 +1,24 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import stations, trains, analytics
+from app.routes import stations, trains, analytics, crowd
 from app.routes.route import router as route_router
 from app.routes.eta import router as eta_router
+from app.routes.fare import router as fare_router
+from app.routes.journey import router as journey_router
 from app.routes.websocket import router as websocket_router, manager
 from app.services.multi_line_train_simulator import multi_line_train_simulator
 from app.services.analytics_service import analytics_service
 from app.services.eta_calculator import eta_calculator
 from app.services.route_calculator import route_calculator
 from app.services.multi_line_station_service import multi_line_station_service
-from app.services.background_scheduler import background_scheduler
+from app.services.background_scheduler import background_scheduler, TICK_INTERVAL_SECONDS
+from app.utils.responses import FastJSONResponse
 
 app = FastAPI(
     title="Delhi Metro Multi-Line Live Tracker API",
     description="Real-time tracking for Delhi Metro Yellow, Blue, Violet, Orange & Aqua Lines with WebSocket support",
-    version="7.0.0"
+    version="7.0.0",
+    default_response_class=FastJSONResponse
 )
 
 app.add_middleware(
@@ -29,7 +33,10 @@ app.include_router(stations.router)
 app.include_router(trains.router)
 app.include_router(route_router)
 app.include_router(analytics.router)
+app.include_router(crowd.router)
 app.include_router(eta_router)
+app.include_router(fare_router)
+app.include_router(journey_router)
 app.include_router(websocket_router)
 
 @app.on_event("startup")
@@ -45,17 +52,18 @@ async def startup_event():
     eta_calculator.set_stations(all_stations)
     route_calculator.set_stations(all_stations)
     
-    trains_data = multi_line_train_simulator.get_all_trains()
-    eta_calculator.set_trains(trains_data)
+    snapshot = multi_line_train_simulator.get_snapshot()
+    trains_data = snapshot.trains
+    eta_calculator.set_snapshot(snapshot)
     
     background_scheduler.set_websocket_manager(manager)
     background_scheduler.start()
     
-    yellow_count = len([t for t in trains_data if t["line"] == "Yellow"])
-    blue_count = len([t for t in trains_data if t["line"] == "Blue"])
-    violet_count = len([t for t in trains_data if t["line"] == "Violet"])
-    orange_count = len([t for t in trains_data if t["line"] == "Orange"])
-    aqua_count = len([t for t in trains_data if t["line"] == "Aqua"])
+    yellow_count = len(snapshot.by_line["Yellow"])
+    blue_count = len(snapshot.by_line["Blue"])
+    violet_count = len(snapshot.by_line["Violet"])
+    orange_count = len(snapshot.by_line["Orange"])
+    aqua_count = len(snapshot.by_line["Aqua"])
     
     print("=" * 70)
     print("🚇 DELHI METRO MULTI-LINE TRACKER STARTED")
@@ -76,7 +84,7 @@ async def startup_event():
     print(f"   🟠 Orange Line: {orange_count} trains (Premium)")
     print(f"   🔵 Aqua Line: {aqua_count} trains (Noida Metro)")
     print(f"WebSocket endpoint: ws://localhost:8000/ws/trains")
-    print(f"Broadcasting train updates every 5 seconds")
+    print(f"Broadcasting train updates every {TICK_INTERVAL_SECONDS} seconds")
     print("=" * 70)
 
 @app.on_event("shutdown")
@@ -87,7 +95,8 @@ async def shutdown_event():
 @app.get("/")
 async def root():
     all_stations = multi_line_station_service.get_all_stations()
-    trains = multi_line_train_simulator.get_all_trains()
+    snapshot = multi_line_train_simulator.get_snapshot()
+    trains = snapshot.trains
     
     return {
         "message": "Delhi Metro Multi-Line Live Tracker API",
@@ -99,33 +108,36 @@ async def root():
             "total_trains": len(trains),
             "yellow_line": {
                 "stations": len([s for s in all_stations if s['line'] == 'Yellow']),
-                "trains": len([t for t in trains if t['line'] == 'Yellow'])
+                "trains": len(snapshot.by_line['Yellow'])
             },
             "blue_line": {
                 "stations": len([s for s in all_stations if s['line'] == 'Blue']),
-                "trains": len([t for t in trains if t['line'] == 'Blue'])
+                "trains": len(snapshot.by_line['Blue'])
             },
             "violet_line": {
                 "stations": len([s for s in all_stations if s['line'] == 'Violet']),
-                "trains": len([t for t in trains if t['line'] == 'Violet'])
+                "trains": len(snapshot.by_line['Violet'])
             },
             "orange_line": {
                 "stations": len([s for s in all_stations if s['line'] == 'Orange']),
-                "trains": len([t for t in trains if t['line'] == 'Orange'])
+                "trains": len(snapshot.by_line['Orange'])
             },
             "aqua_line": {
                 "stations": len([s for s in all_stations if s['line'] == 'Aqua']),
-                "trains": len([t for t in trains if t['line'] == 'Aqua'])
+                "trains": len(snapshot.by_line['Aqua'])
             }
         }
     }
 
 @app.get("/health")
 async def health_check():
-    trains = multi_line_train_simulator.get_all_trains()
+    snapshot = multi_line_train_simulator.get_snapshot()
     return {
         "status": "healthy", 
         "service": "Delhi Metro Multi-Line API",
-        "active_trains": len(trains),
-        "websocket_clients": len(manager.active_connections)
+        "active_trains": len(snapshot.trains),
+        "tick": snapshot.tick,
+        "tick_timestamp": snapshot.timestamp,
+        "websocket_clients": len(manager.active_connections),
+        "websocket_broadcast": manager.get_stats()
     }
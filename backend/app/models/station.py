@@ -10,6 +10,7 @@ class Station(BaseModel):
     station_id: str
     name: str
     display_name: str
+    line: Optional[str] = None
     coordinates: Coordinates
     distance_from_origin_km: float
     layout: str
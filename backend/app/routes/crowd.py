@@ -1,13 +1,17 @@
+import base64
+from datetime import datetime, timedelta
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional, List
 from app.services.crowd_estimator import crowd_estimator
+from app.services.station_store import station_store
+from app.utils.responses import FastJSONResponse
 
 router = APIRouter(prefix="/api/crowd", tags=["crowd"])
 
 @router.get("/current")
 async def get_current_crowd():
     """
-    Get current crowd levels at all Yellow Line stations.
+    Get current crowd levels at all stations on every line.
     Updates based on time of day, day of week, and station characteristics.
     """
     
@@ -20,7 +24,7 @@ async def get_station_crowd(
     time: Optional[str] = Query(
         None,
         description="Time in HH:MM format. If not provided, uses current time.",
-        regex="^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$"
+        pattern="^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$"
     )
 ):
     """
@@ -28,10 +32,10 @@ async def get_station_crowd(
     Includes hourly pattern and recommendations.
     """
     
-    if not (1 <= station_id <= 37):
+    if station_id not in station_store.row_by_id:
         raise HTTPException(
-            status_code=400,
-            detail="Invalid station ID (must be 1-37)"
+            status_code=404,
+            detail=f"Station with ID {station_id} not found"
         )
     
     crowd_data = crowd_estimator.estimate_station_crowd(station_id, time)
@@ -64,10 +68,11 @@ async def compare_stations(
             detail="Invalid station IDs format"
         )
     
-    if not all(1 <= id <= 37 for id in ids):
+    unknown = [id for id in ids if id not in station_store.row_by_id]
+    if unknown:
         raise HTTPException(
             status_code=400,
-            detail="All station IDs must be between 1-37"
+            detail=f"Unknown station IDs: {', '.join(map(str, unknown))}"
         )
     
     comparison = crowd_estimator.compare_station_crowds(ids)
@@ -99,4 +104,63 @@ async def get_crowd_heatmap():
         "timestamp": crowd_data['timestamp'],
         "is_peak_hour": crowd_data['is_peak_hour'],
         "stations": heatmap_data
-    }
\ No newline at end of file
+    }
+
+@router.get("/forecast")
+async def get_crowd_forecast(
+    station_ids: Optional[str] = Query(
+        None,
+        description="Comma-separated station IDs; all stations when omitted"
+    ),
+    line: Optional[str] = Query(None, description="Only stations on this line"),
+    start: Optional[datetime] = Query(
+        None,
+        description="First slot (local time); defaults to the current slot"
+    ),
+    days: int = Query(7, ge=1, le=14, description="Days covered by the grid"),
+    step_minutes: int = Query(15, ge=5, le=1440, description="Slot length in minutes"),
+    encoding: str = Query(
+        "json",
+        pattern="^(json|int8)$",
+        description="json: nested lists; int8: base64 of the row-major int8 matrix"
+    )
+):
+    """
+    Forecast crowd percentages for a set of stations over a time grid.
+    Returns the station IDs (rows), the slot grid (columns) and one
+    stations x slots matrix, with the level thresholds to classify it.
+    """
+    
+    ids = None
+    if station_ids is not None:
+        try:
+            ids = [int(id.strip()) for id in station_ids.split(',')]
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid station IDs format"
+            )
+    
+    if line and line not in station_store.lines:
+        raise HTTPException(status_code=404, detail=f"Line '{line}' not found")
+    
+    if start is None:
+        now = datetime.now()
+        start = now.replace(second=0, microsecond=0) - timedelta(minutes=now.minute % step_minutes)
+    elif start.tzinfo:
+        start = start.astimezone().replace(tzinfo=None)
+    
+    try:
+        forecast = crowd_estimator.forecast(ids, line, start, days * 1440 // step_minutes, step_minutes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    percentages = forecast.pop("percentages")
+    forecast["shape"] = list(percentages.shape)
+    forecast["encoding"] = encoding
+    if encoding == "int8":
+        forecast["percentages"] = base64.b64encode(percentages.tobytes()).decode("ascii")
+    else:
+        forecast["percentages"] = percentages
+    
+    return FastJSONResponse(forecast)
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
 from app.services.eta_calculator import eta_calculator
+from app.utils.responses import FastJSONResponse
 
 router = APIRouter(prefix="/api/eta", tags=["eta"])
 
@@ -8,11 +10,39 @@ async def get_station_eta(station_id: int):
     """Get ETA for trains approaching a specific station"""
     try:
         result = eta_calculator.calculate_eta(station_id)
-        
-        if "error" in result:
-            raise HTTPException(status_code=404, detail=result["error"])
-        
-        return result
     except Exception as e:
         print(f"❌ Error calculating ETA for station {station_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to calculate ETA: {str(e)}")
+    
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    
+    return FastJSONResponse(result)
+
+@router.get("/board")
+async def get_arrival_board(
+    line: Optional[str] = Query(None, description="Filter by line (Yellow, Blue, Violet, Orange, Aqua)")
+):
+    """
+    Get the next arrivals for every station, computed once per simulation tick
+    
+    Parameters:
+    - line: Optional filter
+    """
+    board = eta_calculator.get_board()
+    
+    if line:
+        if line not in board['by_line']:
+            raise HTTPException(status_code=404, detail=f"Line '{line}' not found")
+        stations = board['by_line'][line]
+    else:
+        stations = [entry for entries in board['by_line'].values() for entry in entries]
+    
+    return FastJSONResponse({
+        "tick": board['tick'],
+        "timestamp": board['timestamp'],
+        "line": line,
+        "arrivals_per_direction": board['arrivals_per_direction'],
+        "total": len(stations),
+        "stations": stations
+    })
@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException, Query
+import os
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from app.services.fare_calculator import fare_calculator
 from app.models.fare import FareRequest, FareResponse
+from app.utils.fare_batch import BATCH_EXTENSIONS, BATCH_FORMATS, BatchTooLarge
+
+# Largest batch priced in one request
+MAX_BATCH_PAIRS = 10_000_000
 
 router = APIRouter(prefix="/api/fare", tags=["fare"])
 
@@ -22,16 +28,16 @@ async def calculate_fare(request: FareRequest):
             detail="Source and destination cannot be the same"
         )
     
-    if not (1 <= request.source_station_id <= 37):
+    if not fare_calculator.has_station(request.source_station_id):
         raise HTTPException(
             status_code=400,
-            detail="Invalid source station ID (must be 1-37)"
+            detail="Invalid source station ID"
         )
     
-    if not (1 <= request.destination_station_id <= 37):
+    if not fare_calculator.has_station(request.destination_station_id):
         raise HTTPException(
             status_code=400,
-            detail="Invalid destination station ID (must be 1-37)"
+            detail="Invalid destination station ID"
         )
     
     fare = fare_calculator.calculate_fare(
@@ -48,14 +54,21 @@ async def calculate_fare(request: FareRequest):
             detail="Could not calculate fare"
         )
     
+    smart_card_fare = fare_calculator.fare(
+        request.source_station_id,
+        request.destination_station_id,
+        fare['is_weekend'],
+        True
+    )
+    
     return {
         "source_station": fare['source_station'],
         "destination_station": fare['destination_station'],
         "distance_km": fare['distance_km'],
         "is_weekend": fare['is_weekend'],
         "token_fare": fare['base_fare'],
-        "smart_card_fare": fare['final_fare'] if fare['payment_method'] == 'smart_card' else fare['base_fare'] - fare.get('smart_card_discount', 0),
-        "savings_with_smart_card": fare.get('smart_card_discount', fare['base_fare'] - (fare['base_fare'] - round(fare['base_fare'] * 0.1))),
+        "smart_card_fare": smart_card_fare,
+        "savings_with_smart_card": fare['base_fare'] - smart_card_fare,
         "time_limit_minutes": fare['time_limit_minutes'],
         "currency": fare['currency']
     }
@@ -99,4 +112,65 @@ async def compare_fares(source_id: int, destination_id: int):
             detail="Could not compare fares"
         )
     
-    return comparison
\ No newline at end of file
+    return comparison
+
+@router.post("/batch")
+async def batch_fares(request: Request):
+    """
+    Price many origin-destination pairs in one request.
+    
+    Send the pairs as the request body or as a multipart upload in a
+    "file" field, in one of these formats:
+    - application/json: {"source_ids": [...], "destination_ids": [...]} or
+      {"pairs": [[source, destination], ...]}, with is_weekend and
+      use_smart_card given once or per pair
+    - text/csv: source_id,destination_id[,is_weekend,use_smart_card] rows,
+      with an optional header
+    - application/x-ndjson: one pair object or array per line
+    
+    Station IDs must be integers and flags true/false or 0/1; anything else
+    is a 400, and batches over MAX_BATCH_PAIRS are a 413.
+    
+    Fares stream back in request order, in the same format: a fares list
+    (JSON), or source_id,destination_id,fare rows (CSV, NDJSON arrays).
+    Pairs with an unknown station or no route get a fare of -1.
+    """
+    
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type == "multipart/form-data":
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(
+                status_code=400,
+                detail="Upload the pairs in a 'file' field"
+            )
+        media_type = (upload.content_type or "").split(";")[0].strip().lower()
+        if media_type not in BATCH_FORMATS:
+            media_type = BATCH_EXTENSIONS.get(os.path.splitext(upload.filename or "")[1].lower(), media_type)
+        body = await upload.read()
+    else:
+        body = await request.body()
+    
+    if media_type not in BATCH_FORMATS:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported batch format '{media_type}'; use {', '.join(BATCH_FORMATS)}"
+        )
+    parse, stream = BATCH_FORMATS[media_type]
+    
+    try:
+        pairs = parse(body, MAX_BATCH_PAIRS)
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    fares = fare_calculator.batch_fares(
+        pairs.source_ids,
+        pairs.destination_ids,
+        pairs.is_weekend,
+        pairs.use_smart_card
+    )
+    
+    return StreamingResponse(stream(pairs, fares), media_type=media_type)
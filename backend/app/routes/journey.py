@@ -50,12 +50,14 @@ async def plan_journey(
             "destination": route['destination'],
             "distance_km": route['total_distance_km'],
             "estimated_time_minutes": route['estimated_time_minutes'],
-            "direction": route['direction']
+            "direction": route['direction'],
+            "transfers": route['transfers']
         },
         "route": {
             "total_stations": route['total_stations'],
             "stations": route['stations'],
-            "interchange_stations": route['interchange_stations']
+            "interchange_stations": route['interchange_stations'],
+            "legs": route['legs']
         },
         "fare": {
             "selected_fare": fare['final_fare'],
@@ -13,7 +13,7 @@ async def calculate_route(request: RouteRequest):
     - All stations in the route
     - Total distance and time
     - Direction of travel
-    - Interchange stations
+    - Interchange stations and per-line legs
     """
     
     if request.source_station_id == request.destination_station_id:
@@ -22,16 +22,16 @@ async def calculate_route(request: RouteRequest):
             detail="Source and destination cannot be the same"
         )
     
-    if not (1 <= request.source_station_id <= 37):
+    if not route_calculator.has_station(request.source_station_id):
         raise HTTPException(
             status_code=400, 
-            detail="Invalid source station ID (must be 1-37)"
+            detail="Invalid source station ID"
         )
     
-    if not (1 <= request.destination_station_id <= 37):
+    if not route_calculator.has_station(request.destination_station_id):
         raise HTTPException(
             status_code=400, 
-            detail="Invalid destination station ID (must be 1-37)"
+            detail="Invalid destination station ID"
         )
     
     route = route_calculator.calculate_route(
@@ -1,37 +1,115 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import Optional
+from app.models.station import StationDetailResponse
 from app.services.multi_line_station_service import multi_line_station_service
+from app.services.station_store import STATION_KEYS
+from app.utils.projection import ProjectionCache, paginate, parse_fields
+from app.utils.responses import FastJSONResponse, PrerenderedResponses
 
 router = APIRouter(prefix="/api/stations", tags=["stations"])
 
+# Station listings never change at runtime: rendered once per data version, served with ETags
+prerendered = PrerenderedResponses()
+projections = ProjectionCache()
+
+def _line_payload(line: str) -> dict:
+    stations = multi_line_station_service.get_stations_by_line(line)
+    return {
+        "total": len(stations),
+        "line": line,
+        "stations": stations
+    }
+
+def _all_stations_payload() -> dict:
+    stations = multi_line_station_service.get_all_stations()
+    return {
+        "total": len(stations),
+        "lines": {
+            "Yellow": len(multi_line_station_service.get_stations_by_line("Yellow")),
+            "Blue": len(multi_line_station_service.get_stations_by_line("Blue"))
+        },
+        "stations": stations
+    }
+
 @router.get("")
 async def get_all_stations(
-    line: Optional[str] = Query(None, description="Filter by line (Yellow, Blue)")
+    request: Request,
+    line: Optional[str] = Query(None, description="Filter by line (Yellow, Blue)"),
+    fields: Optional[str] = Query(None, description="Comma-separated station fields to return, e.g. id,name,coordinates,line"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum stations per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ):
     """
     Get all stations or filter by line
     
     Parameters:
     - line: Optional filter (Yellow, Blue)
+    - fields: Optional projection; every field when omitted
+    - limit, cursor: Optional pagination; the response carries next_cursor
     """
+    version = multi_line_station_service.store.version
+    if fields is not None or limit is not None or cursor is not None:
+        try:
+            selected = parse_fields(fields, STATION_KEYS)
+            payload = _line_payload(line) if line else _all_stations_payload()
+            stations = payload["stations"]
+            if selected:
+                stations = projections.project(line, version, stations, selected)
+            payload["stations"], payload["next_cursor"] = paginate(stations, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return FastJSONResponse(payload)
+    
     if line:
-        stations = multi_line_station_service.get_stations_by_line(line)
-        return {
-            "total": len(stations),
-            "line": line,
-            "stations": stations
-        }
+        if not multi_line_station_service.get_stations_by_line(line):
+            return _line_payload(line)
+        return prerendered.respond(request, ("stations", line), version, lambda: _line_payload(line))
     
-    stations = multi_line_station_service.get_all_stations()
+    return prerendered.respond(request, ("stations", None), version, _all_stations_payload)
+
+@router.get("/nearby")
+async def get_nearby_stations(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+    k: int = Query(5, ge=1, le=50, description="Maximum stations returned"),
+    radius_m: float = Query(2000, gt=0, le=50000, description="Search radius in metres")
+):
+    """Get the stations nearest to a point, closest first"""
+    stations = multi_line_station_service.get_nearby_stations(lat, lon, k, radius_m)
     
-    return {
+    return FastJSONResponse({
+        "lat": lat,
+        "lon": lon,
+        "radius_m": radius_m,
         "total": len(stations),
-        "lines": {
-            "Yellow": len([s for s in stations if s['line'] == 'Yellow']),
-            "Blue": len([s for s in stations if s['line'] == 'Blue'])
-        },
         "stations": stations
-    }
+    })
+
+@router.get("/code/{station_code}")
+async def get_station_by_code(station_code: str):
+    """Get a station by its code, e.g. YL16 or BL01"""
+    station = multi_line_station_service.get_station_by_code(station_code)
+    
+    if not station:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Station with code {station_code} not found"
+        )
+    
+    return FastJSONResponse(station)
+
+@router.get("/{station_id}/detail", response_model=StationDetailResponse)
+async def get_station_detail(station_id: int):
+    """Get a station with its previous and next stations on the same line"""
+    detail = multi_line_station_service.get_station_detail(station_id)
+    
+    if not detail:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Station with ID {station_id} not found"
+        )
+    
+    return detail
 
 @router.get("/{station_id}")
 async def get_station_by_id(station_id: int):
@@ -44,38 +122,41 @@ async def get_station_by_id(station_id: int):
             detail=f"Station with ID {station_id} not found"
         )
     
-    return station
+    return FastJSONResponse(station)
 
 @router.get("/search/{query}")
-async def search_stations(query: str):
-    """Search for stations by name"""
-    stations = multi_line_station_service.get_all_stations()
+async def search_stations(
+    query: str,
+    limit: int = Query(10, ge=1, le=100, description="Maximum stations returned")
+):
+    """
+    Search for stations by name
     
-    query_lower = query.lower()
-    matching_stations = [
-        s for s in stations 
-        if query_lower in s['name'].lower() or 
-           query_lower in s.get('display_name', '').lower()
-    ]
+    Matches name prefixes first, then later words, substrings and names one
+    typo away, each ranked by importance.
+    """
+    total, matching_stations = multi_line_station_service.search_stations(query, limit)
     
-    return {
+    return FastJSONResponse({
         "query": query,
-        "total_results": len(matching_stations),
+        "total_results": total,
         "stations": matching_stations
-    }
+    })
 
 @router.get("/interchange/all")
-async def get_interchange_stations():
+async def get_interchange_stations(request: Request):
     """Get all interchange stations"""
-    stations = multi_line_station_service.get_interchange_stations()
+    def build() -> dict:
+        stations = multi_line_station_service.get_interchange_stations()
+        return {
+            "total": len(stations),
+            "stations": stations
+        }
     
-    return {
-        "total": len(stations),
-        "stations": stations
-    }
+    return prerendered.respond(request, "interchange", multi_line_station_service.store.version, build)
 
 @router.get("/line/{line_name}")
-async def get_line_stations(line_name: str):
+async def get_line_stations(request: Request, line_name: str):
     """Get all stations for a specific line"""
     stations = multi_line_station_service.get_stations_by_line(line_name)
     
@@ -85,8 +166,11 @@ async def get_line_stations(line_name: str):
             detail=f"Line '{line_name}' not found"
         )
     
-    return {
-        "line": line_name,
-        "total": len(stations),
-        "stations": stations
-    }
+    def build() -> dict:
+        return {
+            "line": line_name,
+            "total": len(stations),
+            "stations": stations
+        }
+    
+    return prerendered.respond(request, ("line", line_name), multi_line_station_service.store.version, build)
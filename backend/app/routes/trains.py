@@ -1,47 +1,55 @@
 from fastapi import APIRouter, HTTPException, Query
-from datetime import datetime
 from typing import Optional
 from app.services.multi_line_train_simulator import multi_line_train_simulator
-from app.services.eta_calculator import eta_calculator
+from app.services.train_state import TRAIN_KEYS
+from app.utils.projection import ProjectionCache, paginate, parse_fields
+from app.utils.responses import FastJSONResponse
 
 router = APIRouter(prefix="/api/trains", tags=["trains"])
 
+# Projected train lists, rebuilt once per tick
+projections = ProjectionCache()
+
 @router.get("/live")
 async def get_live_trains(
-    line: Optional[str] = Query(None, description="Filter by line (Yellow, Blue)")
+    line: Optional[str] = Query(None, description="Filter by line (Yellow, Blue)"),
+    fields: Optional[str] = Query(None, description="Comma-separated train fields to return, e.g. train_id,line,current_position_km"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum trains per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ):
     """
     Get all currently active trains with real-time positions
     
     Parameters:
     - line: Optional filter (Yellow, Blue)
+    - fields: Optional projection; every field when omitted
+    - limit, cursor: Optional pagination; the response carries next_cursor
     """
-    if line:
-        trains = multi_line_train_simulator.get_trains_by_line(line)
-    else:
-        trains = multi_line_train_simulator.get_all_trains()
-    
-    # Update ETA calculator with current train positions
-    eta_calculator.set_trains(trains)
-    
-    # Get timestamp
-    if trains and len(trains) > 0:
-        timestamp = trains[0].get("last_updated", datetime.now().isoformat())
-    else:
-        timestamp = datetime.now().isoformat()
-    
-    return {
+    snapshot = multi_line_train_simulator.get_snapshot()
+    trains = snapshot.by_line.get(line, ()) if line else snapshot.trains
+    payload = {
         "total_trains": len(trains),
-        "timestamp": timestamp,
+        "timestamp": snapshot.timestamp,
+        "tick": snapshot.tick,
         "trains": trains
     }
+    
+    if fields is not None or limit is not None or cursor is not None:
+        # Train order is stable across ticks, so a cursor stays valid between them
+        try:
+            selected = parse_fields(fields, TRAIN_KEYS)
+            if selected:
+                trains = projections.project(line, (snapshot.tick, snapshot.timestamp), trains, selected)
+            payload["trains"], payload["next_cursor"] = paginate(trains, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    return FastJSONResponse(payload)
 
 @router.get("/live/{train_id}")
 async def get_train_by_id(train_id: str):
     """Get specific train information by ID"""
-    trains = multi_line_train_simulator.get_all_trains()
-    
-    train = next((t for t in trains if t["train_id"] == train_id), None)
+    train = multi_line_train_simulator.get_snapshot().by_id.get(train_id)
     
     if not train:
         raise HTTPException(
@@ -49,21 +57,19 @@ async def get_train_by_id(train_id: str):
             detail=f"Train {train_id} not found"
         )
     
-    return train
+    return FastJSONResponse(train)
 
 @router.get("/count")
 async def get_train_count():
     """Get count of active trains"""
-    trains = multi_line_train_simulator.get_all_trains()
-    
-    yellow_trains = [t for t in trains if t["line"] == "Yellow"]
-    blue_trains = [t for t in trains if t["line"] == "Blue"]
+    snapshot = multi_line_train_simulator.get_snapshot()
+    trains = snapshot.trains
     
     return {
         "total_trains": len(trains),
         "by_line": {
-            "Yellow": len(yellow_trains),
-            "Blue": len(blue_trains)
+            "Yellow": len(snapshot.by_line["Yellow"]),
+            "Blue": len(snapshot.by_line["Blue"])
         },
         "by_status": {
             "moving": len([t for t in trains if t.get("status") == "moving"]),
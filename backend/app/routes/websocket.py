@@ -1,45 +1,268 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List
+from typing import Dict, List, Optional, Set, Union
+import asyncio
 import json
+from app.data.lines import LINE_NAMES
+from app.services.tick_frames import (
+    ALL_TOPIC, KIND_BINARY, KIND_FULL, KIND_KEYFRAME, KIND_STREAM,
+    FrameBuilder, TickFrames, encode_json
+)
 
 router = APIRouter()
 
+# Ticks buffered per client before the oldest one is dropped
+OUTBOUND_QUEUE_SIZE = 4
+# Consecutive broadcasts a client may spend with a full queue before eviction
+MAX_BACKLOGGED_BROADCASTS = 6
+
+# Protocol modes negotiated with ?mode= on /ws/trains
+MODE_FULL = "full"
+MODE_DELTA = "delta"
+MODE_BINARY = "binary"
+STREAM_MODES = (MODE_FULL, MODE_DELTA, MODE_BINARY)
+
+class ClientConnection:
+    """A connected client with its own bounded outbound queue and writer task"""
+
+    def __init__(self, websocket: WebSocket, mode: str = MODE_FULL):
+        self.websocket = websocket
+        self.mode = mode
+        self.topics: Set[str] = {ALL_TOPIC}
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        self.backlogged = 0
+        self.dropped = 0
+        self.writer: Optional[asyncio.Task] = None
+
+    def offer(self, frames: List[Union[str, bytes]], coalesce: bool = False) -> bool:
+        """
+        Queue one tick's frames without waiting.
+
+        When the queue is full the oldest tick is dropped, or with coalesce
+        the whole backlog is replaced by these frames (delta clients resync
+        from keyframes and binary frames carry full state, so older frames
+        are useless to them).
+        Returns False once the client has stayed backed up for too long.
+        """
+        if self.queue.full():
+            dropped = self.queue.qsize() if coalesce else 1
+            for _ in range(dropped):
+                self.queue.get_nowait()
+            self.dropped += dropped
+            self.backlogged += 1
+        else:
+            self.backlogged = 0
+        self.queue.put_nowait(frames)
+        return self.backlogged < MAX_BACKLOGGED_BROADCASTS
+
+    async def write_frames(self):
+        """Drain the queue into the socket at whatever pace the client manages"""
+        while True:
+            for frame in await self.queue.get():
+                if isinstance(frame, bytes):
+                    await self.websocket.send_bytes(frame)
+                else:
+                    await self.websocket.send_text(frame)
+
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        self.frames_sent = 0
+        self.encodes_saved = 0
+        self.last_encodes_saved = 0
+        self.frames_dropped = 0
+        self.clients_evicted = 0
+        self.builder = FrameBuilder()
+        self.frames: Optional[TickFrames] = None
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, mode: str = MODE_FULL):
         await websocket.accept()
-        self.active_connections.append(websocket)
-        print(f"WebSocket connected. Total connections: {len(self.active_connections)}")
+        client = ClientConnection(websocket, mode)
+        client.writer = asyncio.create_task(self._run_writer(client))
+        self.active_connections[websocket] = client
+        self._send_keyframes(client, client.topics)
+        if mode == MODE_BINARY and self.frames:
+            client.offer([self.frames.dictionary()])
+        print(f"WebSocket connected ({mode}). Total connections: {len(self.active_connections)}")
+
+    def _send_keyframes(self, client: ClientConnection, topics: Set[str]):
+        """Late joiners and new subscribers start from keyframes at the current sequence numbers"""
+        if client.mode != MODE_DELTA or not self.frames:
+            return
+        frames = [self.frames.get(topic, KIND_KEYFRAME) for topic in sorted(topics) if topic in self.frames.seqs]
+        if frames:
+            client.offer(frames)
+
+    def handle_message(self, websocket: WebSocket, message: str):
+        """
+        Apply a client control message.
+
+        {"action": "subscribe", "lines": ["Yellow", "Aqua"]} switches the
+        client from the all-lines topic to per-line topics (or adds lines);
+        {"action": "unsubscribe", "lines": [...]} removes them. A single
+        line may be given as a string.
+        """
+        client = self.active_connections.get(websocket)
+        if not client:
+            return
+
+        try:
+            request = json.loads(message)
+            action = request["action"]
+            lines = request.get("lines", [])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            client.offer([encode_json({"type": "error", "detail": "Invalid message"})])
+            return
+
+        if isinstance(lines, str):
+            lines = [lines]
+        if not isinstance(lines, list) or not all(isinstance(line, str) for line in lines):
+            client.offer([encode_json({"type": "error", "detail": "lines must be a list of line names"})])
+            return
+        topics = set(lines)
+
+        unknown = topics - set(LINE_NAMES) - {ALL_TOPIC}
+        if unknown:
+            client.offer([encode_json({"type": "error", "detail": f"Unknown lines: {', '.join(sorted(unknown))}"})])
+            return
+
+        if action == "subscribe":
+            added = topics - client.topics
+            if ALL_TOPIC not in topics:
+                client.topics.discard(ALL_TOPIC)
+            client.topics |= topics
+            self._send_keyframes(client, added)
+        elif action == "unsubscribe":
+            client.topics -= topics
+        else:
+            client.offer([encode_json({"type": "error", "detail": f"Unknown action '{action}'"})])
+            return
+
+        client.offer([encode_json({"type": "subscribed", "lines": sorted(client.topics)})])
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        client = self.active_connections.pop(websocket, None)
+        if not client:
+            return
+        if client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
         print(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
 
-    async def broadcast(self, data: dict):
-        """Broadcast data to all connected clients"""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(data)
-            except Exception as e:
-                print(f"Error broadcasting to client: {e}")
-                disconnected.append(connection)
-        
-        for connection in disconnected:
-            self.disconnect(connection)
+    async def _run_writer(self, client: ClientConnection):
+        try:
+            await client.write_frames()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Error broadcasting to client: {e}")
+            self.disconnect(client.websocket)
+
+    def _evict(self, client: ClientConnection):
+        """Drop a client that cannot keep up"""
+        self.clients_evicted += 1
+        self.disconnect(client.websocket)
+        asyncio.create_task(self._close_quietly(client.websocket))
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
+    async def publish(self, snapshot):
+        """Build this tick's frames from a local simulator snapshot and send them"""
+        await self.publish_frames(self.builder.build(snapshot))
+
+    async def publish_frames(self, frames: TickFrames):
+        """
+        Send one tick's frames to every client in its negotiated mode.
+
+        There is one stream per topic (all lines, or a single line). Each
+        (topic, frame kind) is encoded at most once per tick and only if some
+        client needs it, so per-tick cost scales with topics, not clients.
+        Frames may also arrive prebuilt from the tick publisher process.
+        Frames are only queued here; each client's writer task does the
+        sending, so a slow client never holds up the others.
+        """
+        # A skipped tick (subscriber reconnect) may have hidden a dictionary change
+        dictionary_changed = frames.dictionary_changed or (
+            self.frames is not None and frames.tick != self.frames.tick + 1
+        )
+        self.frames = frames
+        encodes = frames.encodes
+
+        lagging = []
+        queued = 0
+        for client in self.active_connections.values():
+            topics = sorted(t for t in client.topics if t in frames.seqs)
+            dropped = client.dropped
+            if client.mode == MODE_DELTA:
+                kind = KIND_KEYFRAME if client.queue.full() else KIND_STREAM
+                frames_out = [frames.get(topic, kind) for topic in topics]
+                keep = client.offer(frames_out, coalesce=True)
+            elif client.mode == MODE_BINARY:
+                frames_out = [frames.get(topic, KIND_BINARY) for topic in topics]
+                if dictionary_changed or client.queue.full():
+                    frames_out.insert(0, frames.dictionary())
+                keep = client.offer(frames_out, coalesce=True)
+            else:
+                frames_out = [frames.get(topic, KIND_FULL) for topic in topics]
+                keep = client.offer(frames_out)
+            queued += len(frames_out)
+            if not keep:
+                lagging.append(client)
+            self.frames_dropped += client.dropped - dropped
+
+        self.frames_sent += queued
+        self.last_encodes_saved = max(0, queued - (frames.encodes - encodes))
+        self.encodes_saved += self.last_encodes_saved
+
+        for client in lagging:
+            print(f"Evicting WebSocket client backed up for {client.backlogged} broadcasts")
+            self._evict(client)
+
+    def get_stats(self) -> dict:
+        return {
+            "clients": len(self.active_connections),
+            "seq": self.frames.seqs[ALL_TOPIC] if self.frames else 0,
+            "topics": {
+                topic: sum(1 for c in self.active_connections.values() if topic in c.topics)
+                for topic in (self.frames.seqs if self.frames else [ALL_TOPIC])
+            },
+            "frames_sent": self.frames_sent,
+            "encodes_saved_last_tick": self.last_encodes_saved,
+            "encodes_saved_total": self.encodes_saved,
+            "frames_dropped": self.frames_dropped,
+            "clients_evicted": self.clients_evicted
+        }
 
 manager = ConnectionManager()
 
 @router.websocket("/ws/trains")
 async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+    """
+    Live train updates every tick.
+
+    ?mode=full (default) sends the whole train list each tick; ?mode=delta
+    sends a keyframe, then only changed fields per train tagged with seq;
+    ?mode=binary sends a JSON id dictionary, then packed binary frames
+    (layout in app/services/binary_frames.py). Any other mode is closed
+    with code 1008.
+    Clients receive every line until they send a subscribe message naming
+    the lines they want (see ConnectionManager.handle_message).
+    """
+    mode = websocket.query_params.get("mode", MODE_FULL)
+    if mode not in STREAM_MODES:
+        # Closed rather than falling back, so clients never get frames they cannot decode
+        await websocket.accept()
+        await websocket.close(code=1008, reason=f"Unknown mode '{mode}'; use {', '.join(STREAM_MODES)}")
+        return
+    await manager.connect(websocket, mode)
     
     try:
         while True:
             data = await websocket.receive_text()
+            manager.handle_message(websocket, data)
             
     except WebSocketDisconnect:
         manager.disconnect(websocket)
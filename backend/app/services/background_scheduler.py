@@ -1,50 +1,79 @@
 import asyncio
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from app.config import settings
 from app.services.multi_line_train_simulator import multi_line_train_simulator
 from app.services.eta_calculator import eta_calculator
+from app.services.shared_fleet import SharedFleetReader
+from app.services.tick_broker import TickSubscriber
+from app.services.tick_frames import TickFrames
+
+TICK_INTERVAL_SECONDS = 5
+
+TICK_MODE_LOCAL = "local"
+TICK_MODE_SUBSCRIBER = "subscriber"
 
 class BackgroundScheduler:
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
         self.websocket_manager = None
+        self.mode = settings.tick_mode
+        self.subscriber = None
+        self._subscriber_task = None
     
     def set_websocket_manager(self, manager):
         self.websocket_manager = manager
     
     async def update_and_broadcast(self):
+        """Run the single authoritative simulation tick and broadcast its snapshot"""
         try:
-            trains = multi_line_train_simulator.get_all_trains()
-            eta_calculator.set_trains(trains)
+            snapshot = multi_line_train_simulator.tick()
+            eta_calculator.set_snapshot(snapshot)
             
             if self.websocket_manager:
-                yellow_count = len([t for t in trains if t["line"] == "Yellow"])
-                blue_count = len([t for t in trains if t["line"] == "Blue"])
-                violet_count = len([t for t in trains if t["line"] == "Violet"])
-                orange_count = len([t for t in trains if t["line"] == "Orange"])
-                aqua_count = len([t for t in trains if t["line"] == "Aqua"])
-                
-                await self.websocket_manager.broadcast({
-                    "trains": trains,
-                    "timestamp": trains[0]["last_updated"] if trains else None,
-                    "total_trains": len(trains)
-                })
+                await self.websocket_manager.publish(snapshot)
                 
+                counts = {line: len(trains) for line, trains in snapshot.by_line.items()}
                 client_count = len(self.websocket_manager.active_connections)
-                print(f"Broadcast: {yellow_count}Y + {blue_count}B + {violet_count}V + {orange_count}O + {aqua_count}A = {len(trains)} trains to {client_count} clients")
+                print(f"Broadcast tick {snapshot.tick}: {counts['Yellow']}Y + {counts['Blue']}B + {counts['Violet']}V + {counts['Orange']}O + {counts['Aqua']}A = {len(snapshot.trains)} trains to {client_count} clients ({self.websocket_manager.last_encodes_saved} encodes saved)")
         except Exception as e:
             print(f"Error in background scheduler: {e}")
     
+    async def follow_publisher(self):
+        """Fan out ticks simulated by the tick publisher process instead of simulating here"""
+        async for message in self.subscriber.messages():
+            try:
+                frames = TickFrames.deserialize(message)
+                # The publisher fills the shared fleet block before announcing the tick
+                eta_calculator.set_snapshot(multi_line_train_simulator.get_snapshot())
+                
+                if self.websocket_manager:
+                    await self.websocket_manager.publish_frames(frames)
+            except Exception as e:
+                print(f"Error applying published tick: {e}")
+    
     def start(self):
+        if self.mode == TICK_MODE_SUBSCRIBER:
+            multi_line_train_simulator.attach_shared_fleet(SharedFleetReader(
+                settings.fleet_shm_name, stale_after_seconds=2 * TICK_INTERVAL_SECONDS
+            ))
+            self.subscriber = TickSubscriber(settings.tick_socket_path)
+            self._subscriber_task = asyncio.create_task(self.follow_publisher())
+            print(f"Background scheduler following tick publisher at {settings.tick_socket_path}")
+            return
+        
         self.scheduler.add_job(
             self.update_and_broadcast,
             'interval',
-            seconds=5,
+            seconds=TICK_INTERVAL_SECONDS,
             id='train_update_job'
         )
         self.scheduler.start()
-        print("Background scheduler started - updating every 5 seconds")
+        print(f"Background scheduler started - updating every {TICK_INTERVAL_SECONDS} seconds")
     
     def stop(self):
+        if self._subscriber_task:
+            self._subscriber_task.cancel()
+            self._subscriber_task = None
         if self.scheduler.running:
             self.scheduler.shutdown()
             print("Background scheduler stopped")
@@ -0,0 +1,77 @@
+import struct
+import numpy as np
+from datetime import datetime
+from typing import Dict, Mapping, Optional, Sequence
+
+FRAME_MAGIC = b"DMRT"
+FRAME_VERSION = 1
+
+# magic, version, topic, seq, tick, unix timestamp, record count
+FRAME_HEADER = struct.Struct("<4sBBIIdI")
+
+# One record per train, little-endian, 8 bytes
+FRAME_RECORD = np.dtype([
+    ("id", "<u2"),               # index into the dictionary's train list
+    ("position_dam", "<u2"),     # position in 10 m units
+    ("speed_half_kmh", "u1"),    # speed in 0.5 km/h units
+    ("flags", "u1"),             # bit 0: travelling backward, bit 1: at station
+    ("passengers", "<u2")
+])
+
+FLAG_BACKWARD = 1
+FLAG_AT_STATION = 2
+
+# Topic byte for the all-lines topic; other topics use the line index
+ALL_LINES_TOPIC = 255
+
+def encode_frame(
+    columns: Mapping[str, np.ndarray],
+    seq: int,
+    tick: int,
+    timestamp: str,
+    topic: int = ALL_LINES_TOPIC,
+    rows: Optional[np.ndarray] = None
+) -> bytes:
+    """Pack the fleet (or the given rows) into one binary frame"""
+    ids = np.arange(len(columns["position"])) if rows is None else rows
+    records = np.empty(len(ids), dtype=FRAME_RECORD)
+    records["id"] = ids
+    records["position_dam"] = np.clip(np.rint(columns["position"][ids] * 100), 0, 0xFFFF)
+    records["speed_half_kmh"] = np.clip(columns["speed"][ids] * 2, 0, 0xFF)
+    records["flags"] = (columns["direction"][ids] < 0) * FLAG_BACKWARD | (columns["status"][ids] != 0) * FLAG_AT_STATION
+    records["passengers"] = np.clip(columns["passengers"][ids], 0, 0xFFFF)
+
+    header = FRAME_HEADER.pack(
+        FRAME_MAGIC,
+        FRAME_VERSION,
+        topic,
+        seq,
+        tick,
+        datetime.fromisoformat(timestamp).timestamp(),
+        len(records)
+    )
+    return header + records.tobytes()
+
+def build_dictionary(
+    train_ids: Sequence[str],
+    columns: Mapping[str, np.ndarray],
+    line_names: Sequence[str],
+    line_directions: Mapping[str, Sequence[str]]
+) -> Dict:
+    """Text message mapping a binary client's integer ids back to trains"""
+    return {
+        "type": "dictionary",
+        "version": FRAME_VERSION,
+        "lines": list(line_names),
+        "directions": {line: list(line_directions[line]) for line in line_names},
+        "trains": [
+            [i, train_id, line_names[line], capacity]
+            for i, (train_id, line, capacity) in enumerate(zip(
+                train_ids,
+                columns["line_index"].tolist(),
+                columns["capacity"].tolist()
+            ))
+        ],
+        "header": "<4sBBIIdI magic, version, topic (255 = all), seq, tick, unix time, count",
+        "record": "<HHBBH id, position (10 m), speed (0.5 km/h), flags (1 backward, 2 at station), passengers"
+    }
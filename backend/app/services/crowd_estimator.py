@@ -1,9 +1,27 @@
+import numpy as np
 from datetime import datetime
 from typing import Dict, List, Optional
+from app.services.crowd_table import CrowdTable, DEFAULT_CROWD_THRESHOLDS, WEEKDAY, WEEKEND
 from app.services.data_loader import data_loader
+from app.services.station_store import station_store
 
 class CrowdEstimator:
-    """Service to estimate crowd levels at stations"""
+    """
+    Service to estimate crowd levels at stations.
+
+    Crowd levels depend only on the station, hour and day type, so they are
+    read from a precomputed CrowdTable rather than recomputed per request.
+    """
+    
+    def __init__(self):
+        self._table: Optional[CrowdTable] = None
+    
+    def get_table(self) -> CrowdTable:
+        """The crowd table, rebuilt when the station data or thresholds change"""
+        thresholds = data_loader.get_crowd_thresholds() or DEFAULT_CROWD_THRESHOLDS
+        if self._table is None or not self._table.is_current(station_store, thresholds):
+            self._table = CrowdTable(station_store, thresholds)
+        return self._table
     
     def estimate_current_crowd(self) -> Dict:
         """
@@ -15,18 +33,14 @@ class CrowdEstimator:
         is_peak = self._is_peak_hour(now)
         is_weekend = now.weekday() in [5, 6]
         
-        stations = data_loader.get_all_stations()
+        table = self.get_table()
+        day_type = WEEKEND if is_weekend else WEEKDAY
+        percentages = table.percentages[:, now.hour, day_type].tolist()
+        level_indexes = table.level_indexes[:, now.hour, day_type].tolist()
         crowd_levels = []
         
-        for station in stations:
-            crowd_percentage = self._calculate_crowd_percentage(
-                station,
-                is_peak,
-                is_weekend,
-                now
-            )
-            
-            crowd_info = self._get_crowd_info(crowd_percentage)
+        for station, crowd_percentage, level in zip(station_store.rows, percentages, level_indexes):
+            crowd_info = table.levels[level]
             
             crowd_levels.append({
                 "station_id": station['id'],
@@ -56,13 +70,14 @@ class CrowdEstimator:
         Estimate crowd level for a specific station.
         
         Args:
-            station_id: Station ID (1-37)
+            station_id: Station ID
             time_str: Optional time in HH:MM format. If None, uses current time.
         """
         
-        station = data_loader.get_station_by_id(station_id)
-        if not station:
+        row = station_store.row_by_id.get(station_id)
+        if row is None:
             return None
+        station = station_store.rows[row]
         
         # Parse time or use current
         if time_str:
@@ -81,17 +96,13 @@ class CrowdEstimator:
         is_peak = self._is_peak_hour(check_time)
         is_weekend = check_time.weekday() in [5, 6]
         
-        crowd_percentage = self._calculate_crowd_percentage(
-            station,
-            is_peak,
-            is_weekend,
-            check_time
-        )
-        
-        crowd_info = self._get_crowd_info(crowd_percentage)
+        table = self.get_table()
+        day_type = WEEKEND if is_weekend else WEEKDAY
+        crowd_percentage = int(table.percentages[row, check_time.hour, day_type])
+        crowd_info = table.levels[table.level_indexes[row, check_time.hour, day_type]]
         
         # Get hourly pattern
-        hourly_pattern = self._get_hourly_crowd_pattern(station, is_weekend)
+        hourly_pattern = self._get_hourly_crowd_pattern(table, row, day_type)
         
         return {
             "station": {
@@ -117,68 +128,50 @@ class CrowdEstimator:
             "recommendation": self._get_crowd_recommendation(crowd_percentage, is_peak)
         }
     
-    def _calculate_crowd_percentage(
+    def forecast(
         self,
-        station: Dict,
-        is_peak: bool,
-        is_weekend: bool,
-        dt: datetime
-    ) -> int:
-        """
-        Calculate crowd percentage based on multiple factors.
-        Returns: 0-100
+        station_ids: Optional[List[int]],
+        line: Optional[str],
+        start: datetime,
+        slot_count: int,
+        step_minutes: int
+    ) -> Dict:
         """
+        Crowd percentages of a station set over a time grid, in one gather.
         
-        # Base crowd level (importance score contributes 0-50%)
-        importance_score = station.get('importance_score', 5)
-        base_crowd = (importance_score / 10) * 50  # 0-50%
-        
-        # Get station's crowd multiplier
-        multipliers = station.get('avg_crowd_multiplier', {})
+        percentages is a (stations, slots) int8 array: row i is station_ids[i],
+        column j the slot starting step_minutes * j after start.
+        Raises ValueError on unknown station IDs.
+        """
         
-        if is_weekend:
-            multiplier = multipliers.get('weekend', 0.6)
-        elif is_peak:
-            multiplier = multipliers.get('peak', 1.2)
+        if station_ids is not None:
+            unknown = [i for i in station_ids if i not in station_store.row_by_id]
+            if unknown:
+                raise ValueError(f"Unknown station IDs: {', '.join(map(str, unknown))}")
+            rows = np.array([station_store.row_by_id[i] for i in station_ids], dtype=np.int64)
+        elif line:
+            rows = np.array([i for i, name in enumerate(station_store.lines) if name == line], dtype=np.int64)
         else:
-            multiplier = multipliers.get('offpeak', 0.6)
-        
-        # Apply multiplier
-        crowd_percentage = base_crowd * multiplier
-        
-        # Time-based adjustment (more granular)
-        hour = dt.hour
-        
-        # Morning peak (7-10 AM)
-        if 7 <= hour < 10 and not is_weekend:
-            crowd_percentage *= 1.3
-        
-        # Evening peak (5-9 PM)
-        elif 17 <= hour < 21 and not is_weekend:
-            crowd_percentage *= 1.4
-        
-        # Lunch time (12-2 PM)
-        elif 12 <= hour < 14:
-            crowd_percentage *= 1.1
-        
-        # Late night (after 10 PM)
-        elif hour >= 22 or hour < 6:
-            crowd_percentage *= 0.5
-        
-        # Commercial stations are busier on weekdays
-        if station.get('station_type') == 'commercial' and not is_weekend:
-            crowd_percentage *= 1.2
+            rows = np.arange(len(station_store), dtype=np.int64)
         
-        # Residential stations are busier on weekends
-        elif station.get('station_type') == 'residential' and is_weekend:
-            crowd_percentage *= 1.1
+        # Minutes since start's midnight -> hour of day and day type of every slot
+        minutes = start.hour * 60 + start.minute + np.arange(slot_count, dtype=np.int64) * step_minutes
+        hours = (minutes // 60) % 24
+        weekdays = (start.weekday() + minutes // 1440) % 7
+        day_types = np.where(weekdays >= 5, WEEKEND, WEEKDAY)
         
-        # Interchange stations are always busier
-        if station.get('is_interchange', False):
-            crowd_percentage *= 1.15
-        
-        # Cap at 100%
-        return min(100, max(0, round(crowd_percentage)))
+        table = self.get_table()
+        return {
+            "start": start.isoformat(),
+            "step_minutes": step_minutes,
+            "slot_count": slot_count,
+            "station_ids": station_store.ids[rows].tolist(),
+            "levels": [
+                {"label": info['label'], "min": info['min'], "max": info['max']}
+                for info in table.thresholds.values()
+            ],
+            "percentages": table.percentages[rows[:, None], hours, day_types]
+        }
     
     def _is_peak_hour(self, dt: datetime) -> bool:
         """Check if given time is peak hour"""
@@ -191,60 +184,29 @@ class CrowdEstimator:
         # Peak: 7-10 AM and 5-9 PM on weekdays
         return (7 <= hour < 10) or (17 <= hour < 21)
     
-    def _get_crowd_info(self, percentage: int) -> Dict:
-        """Get crowd label, color, and emoji based on percentage"""
-        crowd_thresholds = data_loader.get_crowd_thresholds()
-        
-        for level, info in crowd_thresholds.items():
-            if info['min'] <= percentage < info['max']:
-                return {
-                    'label': info['label'],
-                    'color': info['color'],
-                    'emoji': info['emoji']
-                }
-        
-        # Default to very high if above all thresholds
-        very_high = crowd_thresholds.get('very_high', {})
-        return {
-            'label': very_high.get('label', 'Very High'),
-            'color': very_high.get('color', '#F44336'),
-            'emoji': very_high.get('emoji', '🔴')
-        }
-    
     def _get_hourly_crowd_pattern(
         self,
-        station: Dict,
-        is_weekend: bool
+        table: CrowdTable,
+        row: int,
+        day_type: int
     ) -> List[Dict]:
         """
-        Generate hourly crowd pattern for the day.
+        Hourly crowd pattern for the day (6 AM to 11 PM).
         Useful for charts/visualization.
         """
         
-        pattern = []
-        now = datetime.now()
+        percentages = table.percentages[row, 6:24, day_type].tolist()
+        level_indexes = table.level_indexes[row, 6:24, day_type].tolist()
         
-        for hour in range(6, 24):  # 6 AM to 11 PM
-            check_time = now.replace(hour=hour, minute=0)
-            is_peak = self._is_peak_hour(check_time)
-            
-            crowd_pct = self._calculate_crowd_percentage(
-                station,
-                is_peak,
-                is_weekend,
-                check_time
-            )
-            
-            crowd_info = self._get_crowd_info(crowd_pct)
-            
-            pattern.append({
+        return [
+            {
                 "hour": hour,
                 "time": f"{hour:02d}:00",
                 "crowd_percentage": crowd_pct,
-                "crowd_label": crowd_info['label']
-            })
-        
-        return pattern
+                "crowd_label": table.levels[level]['label']
+            }
+            for hour, crowd_pct, level in zip(range(6, 24), percentages, level_indexes)
+        ]
     
     def _get_crowd_recommendation(self, percentage: int, is_peak: bool) -> str:
         """Get recommendation based on crowd level"""
@@ -261,24 +223,20 @@ class CrowdEstimator:
         """Compare crowd levels across multiple stations"""
         
         now = datetime.now()
-        is_peak = self._is_peak_hour(now)
         is_weekend = now.weekday() in [5, 6]
         
+        table = self.get_table()
+        day_type = WEEKEND if is_weekend else WEEKDAY
         comparisons = []
         
         for station_id in station_ids:
-            station = data_loader.get_station_by_id(station_id)
-            if not station:
+            row = station_store.row_by_id.get(station_id)
+            if row is None:
                 continue
             
-            crowd_pct = self._calculate_crowd_percentage(
-                station,
-                is_peak,
-                is_weekend,
-                now
-            )
-            
-            crowd_info = self._get_crowd_info(crowd_pct)
+            station = station_store.rows[row]
+            crowd_pct = int(table.percentages[row, now.hour, day_type])
+            crowd_info = table.levels[table.level_indexes[row, now.hour, day_type]]
             
             comparisons.append({
                 "station_id": station['id'],
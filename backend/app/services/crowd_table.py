@@ -0,0 +1,129 @@
+import numpy as np
+from typing import Dict, List, Tuple
+from app.services.station_store import StationStore
+
+WEEKDAY = 0
+WEEKEND = 1
+
+# Used when operational_params.json is not loaded; boundaries match the crowd recommendations
+DEFAULT_CROWD_THRESHOLDS = {
+    "low": {"min": 0, "max": 30, "label": "Low", "color": "#4CAF50", "emoji": "🟢"},
+    "moderate": {"min": 30, "max": 60, "label": "Moderate", "color": "#FFC107", "emoji": "🟡"},
+    "high": {"min": 60, "max": 85, "label": "High", "color": "#FF9800", "emoji": "🟠"},
+    "very_high": {"min": 85, "max": 101, "label": "Very High", "color": "#F44336", "emoji": "🔴"}
+}
+
+def is_peak_hours() -> np.ndarray:
+    """(24, 2) peak flags by hour and day type: 7-10 AM and 5-9 PM on weekdays"""
+    hours = np.arange(24)
+    peak = np.zeros((24, 2), dtype=bool)
+    peak[:, WEEKDAY] = ((7 <= hours) & (hours < 10)) | ((17 <= hours) & (hours < 21))
+    return peak
+
+def hour_factors() -> np.ndarray:
+    """(24, 2) time-of-day crowd factors by hour and day type"""
+    factors = np.ones((24, 2))
+    for hour in range(24):
+        for day_type in (WEEKDAY, WEEKEND):
+            is_weekend = day_type == WEEKEND
+            if 7 <= hour < 10 and not is_weekend:
+                factors[hour, day_type] = 1.3
+            elif 17 <= hour < 21 and not is_weekend:
+                factors[hour, day_type] = 1.4
+            elif 12 <= hour < 14:
+                factors[hour, day_type] = 1.1
+            elif hour >= 22 or hour < 6:
+                factors[hour, day_type] = 0.5
+    return factors
+
+def crowd_percentages(
+    importance_scores: np.ndarray,
+    crowd_multipliers: np.ndarray,
+    station_types: List[str],
+    is_interchange: np.ndarray,
+    hours: np.ndarray,
+    day_types: np.ndarray
+) -> np.ndarray:
+    """
+    Crowd percentage (0-100) of every station at every (hour, day type) slot.
+
+    Returns a (stations, slots) int8 array. The float operations run in the
+    same order as the per-station model did, so results are identical.
+    """
+    hours = np.asarray(hours)
+    day_types = np.asarray(day_types)
+    weekend = day_types == WEEKEND
+    peak = is_peak_hours()[hours, day_types]
+
+    # Multiplier column: peak, offpeak, weekend
+    multiplier_column = np.where(weekend, 2, np.where(peak, 0, 1))
+    crowd = (importance_scores / 10 * 50)[:, None] * crowd_multipliers[:, multiplier_column]
+    crowd *= hour_factors()[hours, day_types]
+
+    types = np.asarray(station_types)
+    crowd *= np.where(
+        (types == "commercial")[:, None] & ~weekend,
+        1.2,
+        np.where((types == "residential")[:, None] & weekend, 1.1, 1.0)
+    )
+    crowd *= np.where(is_interchange, 1.15, 1.0)[:, None]
+    return np.clip(np.rint(crowd), 0, 100).astype(np.int8)
+
+def crowd_levels(thresholds: Dict) -> Tuple[List[Dict], np.ndarray]:
+    """
+    Crowd levels (label, color, emoji) and a 101-entry percentage -> level index lookup.
+
+    Each percentage takes the first threshold whose [min, max) range holds
+    it; percentages no range covers fall back to the very_high level.
+    """
+    levels = [
+        {"label": info["label"], "color": info["color"], "emoji": info["emoji"]}
+        for info in thresholds.values()
+    ]
+    very_high = thresholds.get("very_high", {})
+    levels.append({
+        "label": very_high.get("label", "Very High"),
+        "color": very_high.get("color", "#F44336"),
+        "emoji": very_high.get("emoji", "🔴")
+    })
+
+    ranges = [(info["min"], info["max"]) for info in thresholds.values()]
+    lookup = np.full(101, len(levels) - 1, dtype=np.uint8)
+    for percentage in range(101):
+        for index, (low, high) in enumerate(ranges):
+            if low <= percentage < high:
+                lookup[percentage] = index
+                break
+    return levels, lookup
+
+class CrowdTable:
+    """
+    Crowd percentage and level of every station, hour and day type.
+
+    percentages and level_indexes are (stations, 24, 2) arrays indexed by
+    station store row, hour and WEEKDAY/WEEKEND, so crowd queries are
+    array lookups. Built from the station store and the crowd thresholds;
+    version and thresholds tell when a rebuild is due.
+    """
+
+    def __init__(self, store: StationStore, thresholds: Dict):
+        self.version = store.version
+        self.thresholds = thresholds
+        self.levels, self.level_lookup = crowd_levels(thresholds)
+
+        hours, day_types = np.meshgrid(np.arange(24), (WEEKDAY, WEEKEND), indexing="ij")
+        self.percentages = crowd_percentages(
+            store.importance_scores.astype(np.float64),
+            store.crowd_multipliers,
+            store.station_types,
+            store.is_interchange,
+            hours.ravel(),
+            day_types.ravel()
+        ).reshape(len(store), 24, 2)
+        self.level_indexes = self.level_lookup[self.percentages]
+
+        for table in (self.percentages, self.level_indexes):
+            table.setflags(write=False)
+
+    def is_current(self, store: StationStore, thresholds: Dict) -> bool:
+        return self.version == store.version and self.thresholds == thresholds
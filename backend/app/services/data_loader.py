@@ -2,6 +2,7 @@ import json
 from pathlib import Path
 from typing import Dict, List, Optional
 from app.config import settings
+from app.services.station_store import station_store
 
 class DataLoader:
     """Service to load and cache metro data"""
@@ -10,13 +11,16 @@ class DataLoader:
         self._yellow_line_data: Optional[Dict] = None
         self._fare_structure: Optional[Dict] = None
         self._operational_params: Optional[Dict] = None
-        self._stations_by_id: Dict[int, Dict] = {}
-        self._stations_by_station_id: Dict[str, Dict] = {}
+        self._stations_by_station_id: Dict[str, Dict] = {
+            station['station_id']: station for station in station_store.rows
+        }
         
     def load_all_data(self):
-        """Load all required data files"""
-        print("📂 Loading Yellow Line data...")
-        self._yellow_line_data = self._load_json(settings.yellow_line_file)
+        """Load all required data files (stations come from the shared station store)"""
+        print("📂 Loading Yellow Line metadata...")
+        self._yellow_line_data = (
+            self._load_json(settings.yellow_line_file) if settings.yellow_line_file.exists() else {}
+        )
         
         print("💰 Loading fare structure...")
         self._fare_structure = self._load_json(settings.fare_structure_file)
@@ -24,9 +28,6 @@ class DataLoader:
         print("⚙️  Loading operational parameters...")
         self._operational_params = self._load_json(settings.operational_params_file)
         
-        # Build station lookup dictionaries
-        self._build_station_lookups()
-        
         print(f"✅ Data loaded: {len(self.get_all_stations())} stations")
         
     def _load_json(self, file_path: Path) -> Dict:
@@ -39,31 +40,18 @@ class DataLoader:
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON in {file_path}: {e}")
     
-    def _build_station_lookups(self):
-        """Build quick lookup dictionaries for stations"""
-        stations = self._yellow_line_data.get('stations', [])
-        
-        for station in stations:
-            station_id = station.get('id')
-            station_code = station.get('station_id')
-            
-            if station_id:
-                self._stations_by_id[station_id] = station
-            if station_code:
-                self._stations_by_station_id[station_code] = station
-    
     # Yellow Line Data Methods
     def get_line_info(self) -> Dict:
         """Get Yellow Line metadata"""
-        return self._yellow_line_data.get('line_info', {})
+        return (self._yellow_line_data or {}).get('line_info', {})
     
     def get_all_stations(self) -> List[Dict]:
         """Get all stations"""
-        return self._yellow_line_data.get('stations', [])
+        return station_store.rows
     
     def get_station_by_id(self, station_id: int) -> Optional[Dict]:
-        """Get station by numeric ID (1-37)"""
-        return self._stations_by_id.get(station_id)
+        """Get station by numeric ID"""
+        return station_store.get(station_id)
     
     def get_station_by_code(self, station_code: str) -> Optional[Dict]:
         """Get station by code (e.g., 'YL01')"""
@@ -71,7 +59,7 @@ class DataLoader:
     
     def get_all_segments(self) -> List[Dict]:
         """Get all track segments"""
-        return self._yellow_line_data.get('segments', [])
+        return (self._yellow_line_data or {}).get('segments', [])
     
     def get_segment_between(self, from_id: int, to_id: int) -> Optional[Dict]:
         """Get segment between two stations"""
@@ -95,12 +83,12 @@ class DataLoader:
     
     # Fare Structure Methods
     def get_fare_structure(self) -> Dict:
-        """Get complete fare structure"""
-        return self._fare_structure
+        """Get complete fare structure (empty until loaded)"""
+        return self._fare_structure or {}
     
     def get_fare_slabs(self, is_weekend: bool = False) -> List[Dict]:
         """Get fare slabs for weekday or weekend"""
-        fare_slabs = self._fare_structure.get('fare_slabs', {})
+        fare_slabs = self.get_fare_structure().get('fare_slabs', {})
         return fare_slabs.get('weekend' if is_weekend else 'weekday', [])
     
     # Operational Parameters Methods
@@ -117,8 +105,8 @@ class DataLoader:
         return self._operational_params.get('train_frequency', {})
     
     def get_crowd_thresholds(self) -> Dict:
-        """Get crowd level thresholds"""
-        return self._operational_params.get('crowd_thresholds', {})
+        """Get crowd level thresholds (empty until operational parameters are loaded)"""
+        return (self._operational_params or {}).get('crowd_thresholds', {})
     
     # Utility Methods
     def get_total_distance(self) -> float:
@@ -1,107 +1,192 @@
+from bisect import bisect_left, bisect_right
 from typing import List, Dict, Optional
-from datetime import datetime
+from app.data.lines import LINE_AVG_SPEED_KMH, LINE_DIRECTIONS, LINE_DIRECTION_NAMES
+from app.services.network_graph import STATION_DWELL_MINUTES
+
+# Only trains closer than this are reported as approaching
+MAX_LOOKAHEAD_KM = 20
+
+# Arrivals listed per direction on the station board
+BOARD_ARRIVALS = 3
+
+DIRECTION_SIGN = {
+    direction: sign
+    for forward, backward in LINE_DIRECTIONS.values()
+    for direction, sign in ((forward, 1), (backward, -1))
+}
+
+class LineRuntimeTable:
+    """
+    Per-line station offsets and cumulative run times.
+
+    runtime[k] is the scheduled minutes from the line origin to station k,
+    including dwell at every station before it, so ETAs and stations-away
+    counts come from a bisect and a subtraction.
+    """
+    
+    def __init__(self, line: str, stations: List[Dict]):
+        ordered = sorted(stations, key=lambda x: x['distance_from_origin_km'])
+        self.line = line
+        self.speed_kmh = LINE_AVG_SPEED_KMH.get(line, 35)
+        self.station_ids = [s['id'] for s in ordered]
+        self.offsets = [s['distance_from_origin_km'] for s in ordered]
+        self.runtime = [
+            km / self.speed_kmh * 60 + k * STATION_DWELL_MINUTES
+            for k, km in enumerate(self.offsets)
+        ]
+    
+    def eta_minutes(self, position_km: float, direction: int, index: int) -> float:
+        """Minutes until a train at position_km reaches station index"""
+        running = position_km / self.speed_kmh * 60
+        if direction > 0:
+            passed = bisect_right(self.offsets, position_km)
+            return self.runtime[index] - running - passed * STATION_DWELL_MINUTES
+        below = bisect_left(self.offsets, position_km)
+        return running + (below - 1) * STATION_DWELL_MINUTES - self.runtime[index]
+    
+    def stations_away(self, position_km: float, index: int) -> int:
+        """Stations strictly after the train up to and including the target station"""
+        return abs(bisect_right(self.offsets, self.offsets[index]) - bisect_right(self.offsets, position_km))
 
 class ETACalculator:
     def __init__(self):
         self.stations = []
         self.trains = []
+        self.snapshot = None
+        self.stations_by_id: Dict[int, Dict] = {}
+        self.line_tables: Dict[str, LineRuntimeTable] = {}
+        self.station_index: Dict[int, int] = {}
+        self.trains_by_line: Dict[str, List[Dict]] = {}
+        self._board: Optional[Dict] = None
     
     def set_stations(self, stations: List[Dict]):
         self.stations = stations
+        self.stations_by_id = {s['id']: s for s in stations}
+        
+        by_line: Dict[str, List[Dict]] = {}
+        for station in stations:
+            by_line.setdefault(station['line'], []).append(station)
+        
+        self.line_tables = {line: LineRuntimeTable(line, items) for line, items in by_line.items()}
+        self.station_index = {
+            station_id: k
+            for table in self.line_tables.values()
+            for k, station_id in enumerate(table.station_ids)
+        }
+        self._board = None
     
     def set_trains(self, trains: List[Dict]):
         self.trains = trains
+        self.snapshot = None
+        self.trains_by_line = {}
+        for train in trains:
+            self.trains_by_line.setdefault(train['line'], []).append(train)
+        self._board = None
+    
+    def set_snapshot(self, snapshot):
+        """Read train positions from a published simulator snapshot"""
+        self.snapshot = snapshot
+        self.trains = snapshot.trains
+        self.trains_by_line = snapshot.by_line
+        self._board = None
     
     def calculate_eta(self, station_id: int) -> Dict:
-        station = next((s for s in self.stations if s['id'] == station_id), None)
+        """Look up a station's next arrivals on the current board"""
+        entry = self.get_board()['by_station'].get(station_id)
         
-        if not station:
+        if not entry:
             return {"error": "Station not found"}
         
-        line_stations = sorted(
-            [s for s in self.stations if s['line'] == station['line']],
-            key=lambda x: x['distance_from_origin_km']
-        )
-        
-        if station['line'] == 'Yellow':
-            direction_1 = "Towards HUDA City Centre"
-            direction_2 = "Towards Samaypur Badli"
-        elif station['line'] == 'Blue':
-            direction_1 = "Towards Noida Electronic City"
-            direction_2 = "Towards Dwarka Sector 21"
-        elif station['line'] == 'Violet':
-            direction_1 = "Towards Raja Nahar Singh (Ballabhgarh)"
-            direction_2 = "Towards Kashmere Gate"
-        elif station['line'] == 'Orange':
-            direction_1 = "Towards IGI Airport Terminal 3"
-            direction_2 = "Towards New Delhi"
-        elif station['line'] == 'Aqua':
-            direction_1 = "Towards Greater Noida (Depot Station)"
-            direction_2 = "Towards Noida Sector 51"
-        else:
-            direction_1 = "Direction 1"
-            direction_2 = "Direction 2"
-        
-        line_trains = [t for t in self.trains if t['line'] == station['line']]
+        return entry
+    
+    def get_board(self) -> Dict:
+        """
+        Next arrivals per direction for every station.
+
+        Built at most once per published tick and shared by all readers.
+        """
+        tick = self.snapshot.tick if self.snapshot else None
+        if self._board is None or self._board['tick'] != tick:
+            self._board = self._build_board(tick)
+        return self._board
+    
+    def _build_board(self, tick: Optional[int]) -> Dict:
+        by_line = {
+            line: self._sweep_line(table, self.trains_by_line.get(line, ()))
+            for line, table in self.line_tables.items()
+        }
         
-        trains_direction_1 = []
-        trains_direction_2 = []
+        return {
+            'tick': tick,
+            'timestamp': self.snapshot.timestamp if self.snapshot else None,
+            'arrivals_per_direction': BOARD_ARRIVALS,
+            'by_line': by_line,
+            'by_station': {entry['station_id']: entry for entries in by_line.values() for entry in entries}
+        }
+    
+    def _sweep_line(self, table: LineRuntimeTable, trains) -> List[Dict]:
+        """
+        One pass over a line's stations in kilometre order.
+
+        Forward trains are sorted by position, so the nearest ones below a
+        station are the last few behind a pointer that only moves forward;
+        backward trains are the first few ahead of a second pointer.
+        """
+        forward = sorted(
+            (t for t in trains if DIRECTION_SIGN.get(t['direction'], 1) > 0),
+            key=lambda t: t['current_position_km']
+        )
+        backward = sorted(
+            (t for t in trains if DIRECTION_SIGN.get(t['direction'], 1) < 0),
+            key=lambda t: t['current_position_km']
+        )
+        direction_1, direction_2 = LINE_DIRECTION_NAMES.get(table.line, ("Direction 1", "Direction 2"))
         
-        for train in line_trains:
-            distance_diff = station['distance_from_origin_km'] - train['current_position_km']
+        entries = []
+        f = b = 0
+        for index, station_id in enumerate(table.station_ids):
+            station_km = table.offsets[index]
+            while f < len(forward) and forward[f]['current_position_km'] < station_km:
+                f += 1
+            while b < len(backward) and backward[b]['current_position_km'] <= station_km:
+                b += 1
             
-            if 'towards_huda' in train['direction'] or \
-               'towards_noida' in train['direction'] or \
-               'towards_ballabhgarh' in train['direction'] or \
-               'towards_airport' in train['direction'] or \
-               'towards_greaternoida' in train['direction']:
-                if distance_diff > 0 and distance_diff < 20:
-                    stations_away = sum(1 for s in line_stations 
-                                      if train['current_position_km'] < s['distance_from_origin_km'] <= station['distance_from_origin_km'])
-                    
-                    avg_speed = 45 if train['line'] == 'Orange' else 35
-                    eta_minutes = int((distance_diff / avg_speed) * 60)
-                    
-                    trains_direction_1.append({
-                        'train_id': train['train_id'],
-                        'eta_minutes': max(1, eta_minutes),
-                        'stations_away': stations_away,
-                        'current_passengers': train['current_passengers'],
-                        'capacity': train['capacity']
-                    })
-            else:
-                if distance_diff < 0 and abs(distance_diff) < 20:
-                    stations_away = sum(1 for s in line_stations 
-                                      if station['distance_from_origin_km'] < s['distance_from_origin_km'] <= train['current_position_km'])
-                    
-                    avg_speed = 45 if train['line'] == 'Orange' else 35
-                    eta_minutes = int((abs(distance_diff) / avg_speed) * 60)
-                    
-                    trains_direction_2.append({
-                        'train_id': train['train_id'],
-                        'eta_minutes': max(1, eta_minutes),
-                        'stations_away': stations_away,
-                        'current_passengers': train['current_passengers'],
-                        'capacity': train['capacity']
-                    })
-        
-        trains_direction_1.sort(key=lambda x: x['eta_minutes'])
-        trains_direction_2.sort(key=lambda x: x['eta_minutes'])
-        
-        return {
-            'station_id': station_id,
-            'station_name': station['name'],
-            'line': station['line'],
-            'directions': {
-                'direction_1': {
-                    'direction_name': direction_1,
-                    'trains': trains_direction_1[:3]
-                },
-                'direction_2': {
-                    'direction_name': direction_2,
-                    'trains': trains_direction_2[:3]
+            approaching_1 = reversed(forward[max(0, f - BOARD_ARRIVALS):f])
+            approaching_2 = backward[b:b + BOARD_ARRIVALS]
+            station = self.stations_by_id[station_id]
+            
+            entries.append({
+                'station_id': station_id,
+                'station_name': station['name'],
+                'line': table.line,
+                'directions': {
+                    'direction_1': {
+                        'direction_name': direction_1,
+                        'trains': self._arrivals(table, index, approaching_1, 1)
+                    },
+                    'direction_2': {
+                        'direction_name': direction_2,
+                        'trains': self._arrivals(table, index, approaching_2, -1)
+                    }
                 }
-            }
-        }
+            })
+        
+        return entries
+    
+    def _arrivals(self, table: LineRuntimeTable, index: int, trains, sign: int) -> List[Dict]:
+        station_km = table.offsets[index]
+        arrivals = []
+        for train in trains:
+            position = train['current_position_km']
+            if not 0 < (station_km - position) * sign < MAX_LOOKAHEAD_KM:
+                break
+            arrivals.append({
+                'train_id': train['train_id'],
+                'eta_minutes': max(1, int(table.eta_minutes(position, sign, index))),
+                'stations_away': table.stations_away(position, index),
+                'current_passengers': train['current_passengers'],
+                'capacity': train['capacity']
+            })
+        return arrivals
 
 eta_calculator = ETACalculator()
@@ -1,9 +1,84 @@
-from typing import Dict, Optional
+import numpy as np
+from typing import Dict, Optional, Union
 from datetime import datetime
 from app.services.data_loader import data_loader
+from app.services.fare_table import FareTable, NO_FARE, WEEKDAY, WEEKEND, TOKEN, SMART_CARD
+from app.services.station_store import station_store
 
 class FareCalculator:
-    """Service to calculate metro fares"""
+    """
+    Service to calculate metro fares.
+
+    Fares are read from a FareTable of every station pair, priced on the
+    shortest network distance between them, so a fare query is an index
+    lookup.
+    """
+    
+    def __init__(self):
+        self._table: Optional[FareTable] = None
+    
+    def get_table(self) -> FareTable:
+        """The fare table, rebuilt when the station data or fare structure change"""
+        fare_structure = data_loader.get_fare_structure()
+        if self._table is None or not self._table.is_current(station_store, fare_structure):
+            self._table = FareTable(station_store, fare_structure)
+        return self._table
+    
+    def has_station(self, station_id: int) -> bool:
+        return station_id in station_store.row_by_id
+    
+    def fare(
+        self,
+        source_id: int,
+        destination_id: int,
+        is_weekend: bool = False,
+        use_smart_card: bool = False
+    ) -> Optional[int]:
+        """Fare between two stations, or None if either is unknown or unreachable"""
+        source = station_store.row_by_id.get(source_id)
+        destination = station_store.row_by_id.get(destination_id)
+        if source is None or destination is None:
+            return None
+        
+        fare = int(self.get_table().fares[
+            WEEKEND if is_weekend else WEEKDAY,
+            SMART_CARD if use_smart_card else TOKEN,
+            source,
+            destination
+        ])
+        return None if fare == NO_FARE else fare
+    
+    def batch_fares(
+        self,
+        source_ids: np.ndarray,
+        destination_ids: np.ndarray,
+        is_weekend: Union[bool, np.ndarray] = False,
+        use_smart_card: Union[bool, np.ndarray] = False
+    ) -> np.ndarray:
+        """
+        Fares for many pairs at once, as an int16 array aligned with the inputs.
+        
+        The flags may be scalars or per-pair arrays. Pairs with an unknown
+        station or no route get NO_FARE (-1).
+        """
+        table = self.get_table()
+        source_ids = np.asarray(source_ids, dtype=np.int64)
+        destination_ids = np.asarray(destination_ids, dtype=np.int64)
+        
+        def rows(ids: np.ndarray) -> np.ndarray:
+            known = (ids >= 0) & (ids < len(table.row_of_id))
+            return np.where(known, table.row_of_id[np.where(known, ids, 0)], -1)
+        
+        sources = rows(source_ids)
+        destinations = rows(destination_ids)
+        fares = table.fares[
+            np.asarray(is_weekend, dtype=np.intp),
+            np.asarray(use_smart_card, dtype=np.intp),
+            sources,
+            destinations
+        ]
+        fares[(sources < 0) | (destinations < 0)] = NO_FARE
+        return fares
     
     def calculate_fare(
         self,
@@ -17,8 +92,8 @@ class FareCalculator:
         Calculate fare between two stations.
         
         Args:
-            source_id: Source station ID (1-37)
-            destination_id: Destination station ID (1-37)
+            source_id: Source station ID
+            destination_id: Destination station ID
             is_weekend: Whether it's weekend/holiday pricing
             use_smart_card: Whether to apply smart card discount
             travel_date: Optional date string (YYYY-MM-DD) to auto-detect weekend
@@ -27,10 +102,10 @@ class FareCalculator:
             Dictionary with fare breakdown
         """
         
-        source = data_loader.get_station_by_id(source_id)
-        destination = data_loader.get_station_by_id(destination_id)
+        source = station_store.row_by_id.get(source_id)
+        destination = station_store.row_by_id.get(destination_id)
         
-        if not source or not destination:
+        if source is None or destination is None:
             return None
         
         # Auto-detect weekend if date provided
@@ -42,69 +117,34 @@ class FareCalculator:
             except ValueError:
                 pass  # Invalid date format, use provided is_weekend
         
-        # Calculate distance
-        distance = abs(
-            destination['distance_from_origin_km'] - 
-            source['distance_from_origin_km']
-        )
-        
-        # Get fare slabs
-        fare_structure = data_loader.get_fare_structure()
-        fare_slabs = data_loader.get_fare_slabs(is_weekend)
-        
-        # Find applicable fare
-        base_fare = self._find_fare_for_distance(fare_slabs, distance)
-        time_limit = self._find_time_limit_for_distance(fare_slabs, distance)
+        table = self.get_table()
+        day_type = WEEKEND if is_weekend else WEEKDAY
+        base_fare = int(table.fares[day_type, TOKEN, source, destination])
         
-        if base_fare is None:
+        if base_fare == NO_FARE:
             return None
         
-        # Calculate smart card discount
+        # Smart card discount
         smart_card_discount = 0
         final_fare = base_fare
         
         if use_smart_card:
-            discount_percent = fare_structure.get('smart_card_discount_percent', 10)
-            smart_card_discount = round(base_fare * discount_percent / 100)
-            final_fare = base_fare - smart_card_discount
+            final_fare = int(table.fares[day_type, SMART_CARD, source, destination])
+            smart_card_discount = base_fare - final_fare
         
         return {
-            "source_station": source['name'],
-            "destination_station": destination['name'],
-            "distance_km": round(distance, 2),
+            "source_station": station_store.names[source],
+            "destination_station": station_store.names[destination],
+            "distance_km": round(float(table.distance_km[source, destination]), 2),
             "is_weekend": is_weekend,
             "base_fare": base_fare,
             "smart_card_discount": smart_card_discount,
             "final_fare": final_fare,
-            "time_limit_minutes": time_limit,
-            "currency": fare_structure.get('currency', 'INR'),
+            "time_limit_minutes": int(table.time_limits[day_type, source, destination]),
+            "currency": table.currency,
             "payment_method": "smart_card" if use_smart_card else "token"
         }
     
-    def _find_fare_for_distance(self, fare_slabs: list, distance: float) -> Optional[int]:
-        """Find applicable fare based on distance"""
-        for slab in fare_slabs:
-            if slab['min_distance_km'] <= distance <= slab['max_distance_km']:
-                return slab['fare']
-        
-        # If distance exceeds max, return last slab fare
-        if fare_slabs:
-            return fare_slabs[-1]['fare']
-        
-        return None
-    
-    def _find_time_limit_for_distance(self, fare_slabs: list, distance: float) -> int:
-        """Find time limit based on distance"""
-        for slab in fare_slabs:
-            if slab['min_distance_km'] <= distance <= slab['max_distance_km']:
-                return slab['time_limit_minutes']
-        
-        # If distance exceeds max, return last slab time limit
-        if fare_slabs:
-            return fare_slabs[-1]['time_limit_minutes']
-        
-        return 0
-    
     def compare_fares(
         self,
         source_id: int,
@@ -115,44 +155,42 @@ class FareCalculator:
         Shows weekday/weekend and token/smart card combinations.
         """
         
-        source = data_loader.get_station_by_id(source_id)
-        destination = data_loader.get_station_by_id(destination_id)
+        source = station_store.row_by_id.get(source_id)
+        destination = station_store.row_by_id.get(destination_id)
         
-        if not source or not destination:
+        if source is None or destination is None:
             return None
         
-        distance = abs(
-            destination['distance_from_origin_km'] - 
-            source['distance_from_origin_km']
+        table = self.get_table()
+        # [weekday, weekend] x [token, smart card] in one lookup
+        (weekday_token, weekday_smart), (weekend_token, weekend_smart) = (
+            table.fares[:, :, source, destination].tolist()
         )
         
-        # Calculate all combinations
-        weekday_token = self.calculate_fare(source_id, destination_id, False, False)
-        weekday_smart = self.calculate_fare(source_id, destination_id, False, True)
-        weekend_token = self.calculate_fare(source_id, destination_id, True, False)
-        weekend_smart = self.calculate_fare(source_id, destination_id, True, True)
+        if weekday_token == NO_FARE:
+            return None
         
         return {
-            "source_station": source['name'],
-            "destination_station": destination['name'],
-            "distance_km": round(distance, 2),
+            "source_station": station_store.names[source],
+            "destination_station": station_store.names[destination],
+            "distance_km": round(float(table.distance_km[source, destination]), 2),
             "fares": {
-                "weekday_token": weekday_token['final_fare'],
-                "weekday_smart_card": weekday_smart['final_fare'],
-                "weekend_token": weekend_token['final_fare'],
-                "weekend_smart_card": weekend_smart['final_fare']
+                "weekday_token": weekday_token,
+                "weekday_smart_card": weekday_smart,
+                "weekend_token": weekend_token,
+                "weekend_smart_card": weekend_smart
             },
             "savings": {
-                "smart_card_weekday": weekday_token['final_fare'] - weekday_smart['final_fare'],
-                "smart_card_weekend": weekend_token['final_fare'] - weekend_smart['final_fare'],
-                "weekend_vs_weekday": weekday_token['final_fare'] - weekend_token['final_fare'],
-                "best_option_savings": weekday_token['final_fare'] - weekend_smart['final_fare']
+                "smart_card_weekday": weekday_token - weekday_smart,
+                "smart_card_weekend": weekend_token - weekend_smart,
+                "weekend_vs_weekday": weekday_token - weekend_token,
+                "best_option_savings": weekday_token - weekend_smart
             },
             "best_option": {
-                "fare": weekend_smart['final_fare'],
+                "fare": weekend_smart,
                 "description": "Weekend + Smart Card"
             },
-            "time_limit_minutes": weekday_token['time_limit_minutes']
+            "time_limit_minutes": int(table.time_limits[WEEKDAY, source, destination])
         }
 
 # Create global instance
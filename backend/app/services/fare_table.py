@@ -0,0 +1,103 @@
+import numpy as np
+from typing import Dict, List
+from app.services.network_graph import NetworkGraph
+from app.services.station_store import StationStore
+
+WEEKDAY = 0
+WEEKEND = 1
+TOKEN = 0
+SMART_CARD = 1
+
+# Fare for a pair with no route between them
+NO_FARE = -1
+
+# DMRC's limit on time spent inside the paid area
+DEFAULT_TIME_LIMIT_MINUTES = 170
+
+# Used when fare_structure.json is not loaded (the same slabs apply on weekends)
+DEFAULT_FARE_SLABS = [
+    {"min_distance_km": 0, "max_distance_km": 2, "fare": 10, "time_limit_minutes": DEFAULT_TIME_LIMIT_MINUTES},
+    {"min_distance_km": 2, "max_distance_km": 5, "fare": 20, "time_limit_minutes": DEFAULT_TIME_LIMIT_MINUTES},
+    {"min_distance_km": 5, "max_distance_km": 12, "fare": 30, "time_limit_minutes": DEFAULT_TIME_LIMIT_MINUTES},
+    {"min_distance_km": 12, "max_distance_km": 21, "fare": 40, "time_limit_minutes": DEFAULT_TIME_LIMIT_MINUTES},
+    {"min_distance_km": 21, "max_distance_km": 32, "fare": 50, "time_limit_minutes": DEFAULT_TIME_LIMIT_MINUTES},
+    {"min_distance_km": 32, "max_distance_km": 1000, "fare": 60, "time_limit_minutes": DEFAULT_TIME_LIMIT_MINUTES}
+]
+DEFAULT_SMART_CARD_DISCOUNT_PERCENT = 10
+
+def network_distances(graph: NetworkGraph) -> np.ndarray:
+    """
+    Shortest network distance in km between every pair of graph nodes.
+
+    Floyd-Warshall, vectorised over the matrix for each intermediate node;
+    transfers between platforms of one station cost 0 km. Unreachable
+    pairs are infinite.
+    """
+    n = len(graph.stations)
+    distances = np.full((n, n), np.inf)
+    np.fill_diagonal(distances, 0.0)
+    for a, edges in enumerate(graph.adjacency):
+        for b, _, km, _ in edges:
+            distances[a, b] = min(distances[a, b], km)
+
+    for k in range(n):
+        np.minimum(distances, distances[:, k, None] + distances[None, k, :], out=distances)
+    return distances
+
+def slab_indexes(slabs: List[Dict], distances: np.ndarray) -> np.ndarray:
+    """Index of the first slab whose [min, max] holds each distance; the last slab beyond them all"""
+    indexes = np.full(distances.shape, len(slabs) - 1, dtype=np.int16)
+    for i in reversed(range(len(slabs))):
+        within = (slabs[i]['min_distance_km'] <= distances) & (distances <= slabs[i]['max_distance_km'])
+        indexes[within] = i
+    return indexes
+
+class FareTable:
+    """
+    Fares between every pair of stations, by day type and payment method.
+
+    fares is a (2, 2, n, n) int16 array indexed [WEEKDAY/WEEKEND,
+    TOKEN/SMART_CARD, origin row, destination row] by station store row;
+    time_limits is (2, n, n) int16 and distance_km the (n, n) shortest
+    network distance the fares are based on, and row_of_id maps station
+    IDs to rows. Built from the station store and the fare structure;
+    version and fare_structure tell when a rebuild is due.
+    """
+
+    def __init__(self, store: StationStore, fare_structure: Dict):
+        self.version = store.version
+        self.fare_structure = fare_structure
+        self.currency = fare_structure.get('currency', 'INR')
+        self.discount_percent = fare_structure.get('smart_card_discount_percent', DEFAULT_SMART_CARD_DISCOUNT_PERCENT)
+
+        graph = NetworkGraph()
+        graph.build(store.rows)
+        # Metre precision, so summed segment lengths land on slab boundaries exactly
+        self.distance_km = np.round(network_distances(graph), 3)
+        reachable = np.isfinite(self.distance_km)
+
+        # Station ID -> store row (-1 for unused IDs), for vectorised batch lookups
+        self.row_of_id = np.full(int(store.ids.max()) + 1 if len(store) else 0, -1, dtype=np.int32)
+        self.row_of_id[store.ids] = np.arange(len(store), dtype=np.int32)
+
+        n = len(store)
+        self.fares = np.full((2, 2, n, n), NO_FARE, dtype=np.int16)
+        self.time_limits = np.zeros((2, n, n), dtype=np.int16)
+        fare_slabs = fare_structure.get('fare_slabs', {})
+        for day_type, name in ((WEEKDAY, 'weekday'), (WEEKEND, 'weekend')):
+            slabs = fare_slabs.get(name) or DEFAULT_FARE_SLABS
+            indexes = slab_indexes(slabs, self.distance_km)
+            base = np.array([slab['fare'] for slab in slabs], dtype=np.int16)[indexes]
+            discount = np.rint(base.astype(np.float64) * self.discount_percent / 100).astype(np.int16)
+
+            self.fares[day_type, TOKEN] = np.where(reachable, base, NO_FARE)
+            self.fares[day_type, SMART_CARD] = np.where(reachable, base - discount, NO_FARE)
+            self.time_limits[day_type] = np.array(
+                [slab['time_limit_minutes'] for slab in slabs], dtype=np.int16
+            )[indexes]
+
+        for table in (self.distance_km, self.fares, self.time_limits, self.row_of_id):
+            table.setflags(write=False)
+
+    def is_current(self, store: StationStore, fare_structure: Dict) -> bool:
+        return self.version == store.version and self.fare_structure == fare_structure
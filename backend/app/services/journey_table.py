@@ -0,0 +1,90 @@
+import numpy as np
+from typing import List, Optional
+from app.services.network_graph import NetworkGraph
+
+class JourneyTable:
+    """
+    Precomputed fastest journeys between every pair of stations.
+
+    All matrices are indexed [origin, destination] by the graph's dense
+    station index. predecessor[o, d] is the node before d on the fastest
+    path from o, so a full path is unrolled by walking back to o.
+    Platform changes at the very start or end of a journey are neither
+    counted in transfers nor charged in time_minutes.
+    """
+    
+    def __init__(self):
+        self.version = 0
+        self.size = 0
+        self.time_minutes = np.empty((0, 0), dtype=np.float32)
+        self.distance_km = np.empty((0, 0), dtype=np.float32)
+        self.hops = np.empty((0, 0), dtype=np.int16)
+        self.transfers = np.empty((0, 0), dtype=np.int8)
+        self.predecessor = np.empty((0, 0), dtype=np.int16)
+    
+    def build(self, graph: NetworkGraph):
+        """Run Dijkstra from every station and fill the matrices"""
+        n = len(graph.stations)
+        time_minutes = np.full((n, n), np.inf, dtype=np.float32)
+        distance_km = np.zeros((n, n), dtype=np.float32)
+        hops = np.zeros((n, n), dtype=np.int16)
+        transfers = np.zeros((n, n), dtype=np.int8)
+        predecessor = np.full((n, n), -1, dtype=np.int16)
+        
+        for origin in range(n):
+            minutes, previous, order = graph.shortest_tree(origin)
+            km = [0.0] * n
+            hop = [0] * n
+            transfer = [0] * n
+            reported = [0] * n
+            riding = [False] * n
+            # Minutes with only the counted transfers' penalties, and as reported per destination
+            charged = [0.0] * n
+            reported_minutes = [0.0] * n
+            
+            # Settle order is topological for the shortest-path tree
+            for node in order[1:]:
+                parent = previous[node]
+                _, edge_minutes, edge_km, is_transfer = graph.edge(parent, node)
+                km[node] = km[parent] + edge_km
+                hop[node] = hop[parent] + (not is_transfer)
+                # Changing platforms before the first ride is not a transfer
+                transfer[node] = transfer[parent] + (is_transfer and riding[parent])
+                riding[node] = riding[parent] or not is_transfer
+                # ...and neither is stepping onto the destination's platform at the end
+                reported[node] = transfer[parent] if is_transfer else transfer[node]
+                # Platform changes that are not reported as transfers cost no time either
+                counted = not is_transfer or riding[parent]
+                charged[node] = charged[parent] + (edge_minutes if counted else 0.0)
+                reported_minutes[node] = charged[parent] if is_transfer else charged[node]
+            
+            time_minutes[origin] = np.where(np.isfinite(minutes), reported_minutes, np.inf)
+            distance_km[origin] = km
+            hops[origin] = hop
+            transfers[origin] = reported
+            predecessor[origin] = previous
+        
+        self.size = n
+        self.time_minutes = time_minutes
+        self.distance_km = distance_km
+        self.hops = hops
+        self.transfers = transfers
+        self.predecessor = predecessor
+        self.version += 1
+    
+    def is_reachable(self, origin: int, destination: int) -> bool:
+        return bool(np.isfinite(self.time_minutes[origin, destination]))
+    
+    def path(self, origin: int, destination: int) -> Optional[List[int]]:
+        """Unroll the predecessor row into the node path origin -> destination"""
+        if not self.is_reachable(origin, destination):
+            return None
+        
+        row = self.predecessor[origin]
+        path = [destination]
+        node = destination
+        while node != origin:
+            node = int(row[node])
+            path.append(node)
+        path.reverse()
+        return path
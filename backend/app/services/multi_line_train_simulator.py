@@ -1,183 +1,219 @@
 import random
-from datetime import datetime
-from typing import List, Dict
+import numpy as np
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional, Tuple
+from app.data.lines import LINE_NAMES, LINE_LENGTHS_KM, LINE_DIRECTIONS, LINE_MAX_SPEED_KMH
+from app.services.shared_fleet import FleetState, SharedFleetReader
+from app.services.train_state import TrainStateEngine, MOVING, AT_STATION, train_dicts
+
+@dataclass(frozen=True)
+class TrainSnapshot:
+    """
+    Read-only view of the fleet published once per simulation tick.
+
+    The containers are immutable (tuples and mapping proxies), but the train
+    dicts inside trains, by_id and by_line are plain dicts shared by every
+    reader: they are built fresh for every tick and must not be mutated
+    after publication. Readers that need to change a train copy it first
+    with dict(train). Dicts are kept (rather than wrapped in read-only
+    proxies) because orjson encodes them natively on the hot REST and
+    WebSocket paths.
+    """
+    tick: int
+    timestamp: str
+    trains: Tuple[Dict, ...]
+    by_id: Mapping[str, Dict]
+    by_line: Mapping[str, Tuple[Dict, ...]]
+    train_ids: Tuple[str, ...]
+    columns: Mapping[str, np.ndarray]
+    line_rows: Mapping[str, np.ndarray]
 
 class MultiLineTrainSimulator:
     def __init__(self):
-        self.trains = []
-        self.yellow_line_length = 45.7
-        self.blue_line_length = 58.5
-        self.violet_line_length = 47.0
-        self.orange_line_length = 22.7
-        self.aqua_line_length = 29.7
+        self.engine = TrainStateEngine(
+            line_names=LINE_NAMES,
+            line_lengths_km=[LINE_LENGTHS_KM[line] for line in LINE_NAMES],
+            line_directions=[LINE_DIRECTIONS[line] for line in LINE_NAMES],
+            line_max_speed_kmh=[LINE_MAX_SPEED_KMH[line] for line in LINE_NAMES]
+        )
+        self._shared_fleet: Optional[SharedFleetReader] = None
+        self._shared_state: Optional[FleetState] = None
         self._initialize_trains()
+        self._snapshot = self._build_snapshot(0)
     
     def _initialize_trains(self):
         """Initialize trains on all five lines"""
-        # Yellow Line trains (8 trains)
-        yellow_positions = [
-            (1, 5.2, "towards_huda"),
-            (2, 12.8, "towards_huda"),
-            (3, 23.5, "towards_huda"),
-            (4, 35.1, "towards_huda"),
-            (5, 42.3, "towards_samaypur"),
-            (6, 31.7, "towards_samaypur"),
-            (7, 18.9, "towards_samaypur"),
-            (8, 9.4, "towards_samaypur"),
-        ]
-        
-        for train_num, position, direction in yellow_positions:
-            self.trains.append({
-                "train_id": f"YL-{train_num:03d}",
-                "line": "Yellow",
-                "current_position_km": position,
-                "direction": direction,
-                "status": random.choice(["moving", "at_station"]),
-                "speed_kmh": random.randint(30, 40) if random.random() > 0.3 else 0,
-                "current_passengers": random.randint(150, 280),
-                "capacity": 300,
-                "last_updated": datetime.now().isoformat(),
-                "next_station_id": None,
-                "next_station_name": "Updating..."
-            })
-        
-        # Blue Line trains (10 trains)
-        blue_positions = [
-            (1, 5.0, "towards_noida"),
-            (2, 12.5, "towards_noida"),
-            (3, 20.0, "towards_noida"),
-            (4, 28.0, "towards_noida"),
-            (5, 38.0, "towards_noida"),
-            (6, 50.0, "towards_dwarka"),
-            (7, 42.0, "towards_dwarka"),
-            (8, 32.0, "towards_dwarka"),
-            (9, 22.0, "towards_dwarka"),
-            (10, 10.0, "towards_dwarka"),
-        ]
+        fleet = {
+            # Yellow Line trains (8 trains)
+            "Yellow": {
+                "prefix": "YL",
+                "positions": [
+                    (1, 5.2, "towards_huda"),
+                    (2, 12.8, "towards_huda"),
+                    (3, 23.5, "towards_huda"),
+                    (4, 35.1, "towards_huda"),
+                    (5, 42.3, "towards_samaypur"),
+                    (6, 31.7, "towards_samaypur"),
+                    (7, 18.9, "towards_samaypur"),
+                    (8, 9.4, "towards_samaypur"),
+                ],
+                "speed_range": (30, 40),
+                "stopped_probability": 0.3,
+                "passenger_range": (150, 280),
+                "capacity": 300
+            },
+            # Blue Line trains (10 trains)
+            "Blue": {
+                "prefix": "BL",
+                "positions": [
+                    (1, 5.0, "towards_noida"),
+                    (2, 12.5, "towards_noida"),
+                    (3, 20.0, "towards_noida"),
+                    (4, 28.0, "towards_noida"),
+                    (5, 38.0, "towards_noida"),
+                    (6, 50.0, "towards_dwarka"),
+                    (7, 42.0, "towards_dwarka"),
+                    (8, 32.0, "towards_dwarka"),
+                    (9, 22.0, "towards_dwarka"),
+                    (10, 10.0, "towards_dwarka"),
+                ],
+                "speed_range": (30, 40),
+                "stopped_probability": 0.3,
+                "passenger_range": (180, 300),
+                "capacity": 320
+            },
+            # Violet Line trains (8 trains)
+            "Violet": {
+                "prefix": "VL",
+                "positions": [
+                    (1, 5.0, "towards_ballabhgarh"),
+                    (2, 12.0, "towards_ballabhgarh"),
+                    (3, 20.0, "towards_ballabhgarh"),
+                    (4, 30.0, "towards_ballabhgarh"),
+                    (5, 40.0, "towards_kashmere"),
+                    (6, 32.0, "towards_kashmere"),
+                    (7, 20.0, "towards_kashmere"),
+                    (8, 10.0, "towards_kashmere"),
+                ],
+                "speed_range": (30, 40),
+                "stopped_probability": 0.3,
+                "passenger_range": (160, 290),
+                "capacity": 310
+            },
+            # Orange Line trains (4 trains - Airport Express)
+            "Orange": {
+                "prefix": "OL",
+                "positions": [
+                    (1, 3.0, "towards_airport"),
+                    (2, 10.0, "towards_airport"),
+                    (3, 18.0, "towards_newdelhi"),
+                    (4, 8.0, "towards_newdelhi"),
+                ],
+                "speed_range": (35, 50),
+                "stopped_probability": 0.2,
+                "passenger_range": (80, 150),
+                "capacity": 180
+            },
+            # Aqua Line trains (6 trains - Noida Metro)
+            "Aqua": {
+                "prefix": "AQ",
+                "positions": [
+                    (1, 3.0, "towards_greaternoida"),
+                    (2, 10.0, "towards_greaternoida"),
+                    (3, 18.0, "towards_greaternoida"),
+                    (4, 25.0, "towards_sector51"),
+                    (5, 15.0, "towards_sector51"),
+                    (6, 8.0, "towards_sector51"),
+                ],
+                "speed_range": (30, 40),
+                "stopped_probability": 0.3,
+                "passenger_range": (120, 220),
+                "capacity": 250
+            }
+        }
         
-        for train_num, position, direction in blue_positions:
-            self.trains.append({
-                "train_id": f"BL-{train_num:03d}",
-                "line": "Blue",
-                "current_position_km": position,
-                "direction": direction,
-                "status": random.choice(["moving", "at_station"]),
-                "speed_kmh": random.randint(30, 40) if random.random() > 0.3 else 0,
-                "current_passengers": random.randint(180, 300),
-                "capacity": 320,
-                "last_updated": datetime.now().isoformat(),
-                "next_station_id": None,
-                "next_station_name": "Updating..."
-            })
+        columns = {key: [] for key in (
+            "train_ids", "line_index", "position_km", "direction",
+            "speed_kmh", "status", "passengers", "capacity"
+        )}
         
-        # Violet Line trains (8 trains)
-        violet_positions = [
-            (1, 5.0, "towards_ballabhgarh"),
-            (2, 12.0, "towards_ballabhgarh"),
-            (3, 20.0, "towards_ballabhgarh"),
-            (4, 30.0, "towards_ballabhgarh"),
-            (5, 40.0, "towards_kashmere"),
-            (6, 32.0, "towards_kashmere"),
-            (7, 20.0, "towards_kashmere"),
-            (8, 10.0, "towards_kashmere"),
-        ]
+        for line, spec in fleet.items():
+            forward_direction = LINE_DIRECTIONS[line][0]
+            for train_num, position, direction in spec["positions"]:
+                columns["train_ids"].append(f"{spec['prefix']}-{train_num:03d}")
+                columns["line_index"].append(LINE_NAMES.index(line))
+                columns["position_km"].append(position)
+                columns["direction"].append(1 if direction == forward_direction else -1)
+                columns["status"].append(random.choice([MOVING, AT_STATION]))
+                columns["speed_kmh"].append(
+                    random.randint(*spec["speed_range"]) if random.random() > spec["stopped_probability"] else 0
+                )
+                columns["passengers"].append(random.randint(*spec["passenger_range"]))
+                columns["capacity"].append(spec["capacity"])
         
-        for train_num, position, direction in violet_positions:
-            self.trains.append({
-                "train_id": f"VL-{train_num:03d}",
-                "line": "Violet",
-                "current_position_km": position,
-                "direction": direction,
-                "status": random.choice(["moving", "at_station"]),
-                "speed_kmh": random.randint(30, 40) if random.random() > 0.3 else 0,
-                "current_passengers": random.randint(160, 290),
-                "capacity": 310,
-                "last_updated": datetime.now().isoformat(),
-                "next_station_id": None,
-                "next_station_name": "Updating..."
-            })
-        
-        # Orange Line trains (4 trains - Airport Express)
-        orange_positions = [
-            (1, 3.0, "towards_airport"),
-            (2, 10.0, "towards_airport"),
-            (3, 18.0, "towards_newdelhi"),
-            (4, 8.0, "towards_newdelhi"),
-        ]
-        
-        for train_num, position, direction in orange_positions:
-            self.trains.append({
-                "train_id": f"OL-{train_num:03d}",
-                "line": "Orange",
-                "current_position_km": position,
-                "direction": direction,
-                "status": random.choice(["moving", "at_station"]),
-                "speed_kmh": random.randint(35, 50) if random.random() > 0.2 else 0,
-                "current_passengers": random.randint(80, 150),
-                "capacity": 180,
-                "last_updated": datetime.now().isoformat(),
-                "next_station_id": None,
-                "next_station_name": "Updating..."
-            })
+        self.engine.add_trains(**columns)
+    
+    def _build_snapshot(self, tick: int) -> TrainSnapshot:
+        return self._snapshot_from(
+            tick, self.engine.last_updated.isoformat(), tuple(self.engine.train_ids), self.engine.columns()
+        )
+    
+    def _snapshot_from(self, tick: int, timestamp: str, train_ids: Tuple[str, ...], columns: Dict) -> TrainSnapshot:
+        trains = tuple(train_dicts(
+            train_ids, columns, self.engine.line_names, self.engine.line_directions, timestamp
+        ))
+        by_line = {line: [] for line in self.engine.line_names}
+        for train in trains:
+            by_line[train["line"]].append(train)
         
-        # Aqua Line trains (6 trains - Noida Metro)
-        aqua_positions = [
-            (1, 3.0, "towards_greaternoida"),
-            (2, 10.0, "towards_greaternoida"),
-            (3, 18.0, "towards_greaternoida"),
-            (4, 25.0, "towards_sector51"),
-            (5, 15.0, "towards_sector51"),
-            (6, 8.0, "towards_sector51"),
-        ]
+        line_rows = {
+            line: np.flatnonzero(columns["line_index"] == i)
+            for i, line in enumerate(self.engine.line_names)
+        }
         
-        for train_num, position, direction in aqua_positions:
-            self.trains.append({
-                "train_id": f"AQ-{train_num:03d}",
-                "line": "Aqua",
-                "current_position_km": position,
-                "direction": direction,
-                "status": random.choice(["moving", "at_station"]),
-                "speed_kmh": random.randint(30, 40) if random.random() > 0.3 else 0,
-                "current_passengers": random.randint(120, 220),
-                "capacity": 250,
-                "last_updated": datetime.now().isoformat(),
-                "next_station_id": None,
-                "next_station_name": "Updating..."
-            })
+        return TrainSnapshot(
+            tick=tick,
+            timestamp=timestamp,
+            trains=trains,
+            by_id=MappingProxyType({t["train_id"]: t for t in trains}),
+            by_line=MappingProxyType({line: tuple(t) for line, t in by_line.items()}),
+            train_ids=train_ids,
+            columns=MappingProxyType(columns),
+            line_rows=MappingProxyType(line_rows)
+        )
+    
+    def tick(self) -> TrainSnapshot:
+        """Advance the simulation one step and publish a new snapshot"""
+        self.engine.step()
+        self._snapshot = self._build_snapshot(self._snapshot.tick + 1)
+        return self._snapshot
+    
+    def attach_shared_fleet(self, reader: SharedFleetReader):
+        """
+        Follow the fleet another process simulates (tick subscriber mode).
+
+        Snapshots are then rebuilt from the shared memory block whenever it
+        is rewritten (or recreated), instead of by stepping the local engine.
+        """
+        self._shared_fleet = reader
+    
+    def get_snapshot(self) -> TrainSnapshot:
+        """Get the latest published snapshot (no simulation work)"""
+        if self._shared_fleet:
+            state = self._shared_fleet.read()
+            # The reader returns the same object until seq or the block's generation changes
+            if state and state is not self._shared_state:
+                self._shared_state = state
+                self._snapshot = self._snapshot_from(state.tick, state.timestamp, state.train_ids, dict(state.columns))
+        return self._snapshot
     
     def get_all_trains(self) -> List[Dict]:
-        """Get all active trains"""
-        for train in self.trains:
-            if train["status"] == "moving":
-                line_length = self.yellow_line_length if train["line"] == "Yellow" else \
-                             self.blue_line_length if train["line"] == "Blue" else \
-                             self.violet_line_length if train["line"] == "Violet" else \
-                             self.orange_line_length if train["line"] == "Orange" else \
-                             self.aqua_line_length
-                
-                if "towards_huda" in train["direction"] or \
-                   "towards_noida" in train["direction"] or \
-                   "towards_ballabhgarh" in train["direction"] or \
-                   "towards_airport" in train["direction"] or \
-                   "towards_greaternoida" in train["direction"]:
-                    train["current_position_km"] += random.uniform(0.1, 0.3)
-                    if train["current_position_km"] > line_length:
-                        train["current_position_km"] = 0.0
-                else:
-                    train["current_position_km"] -= random.uniform(0.1, 0.3)
-                    if train["current_position_km"] < 0:
-                        train["current_position_km"] = line_length
-            
-            if random.random() < 0.05:
-                train["status"] = "at_station" if train["status"] == "moving" else "moving"
-                train["speed_kmh"] = 0 if train["status"] == "at_station" else random.randint(30, 50 if train["line"] == "Orange" else 40)
-            
-            train["last_updated"] = datetime.now().isoformat()
-        
-        return self.trains
+        """Get all active trains from the latest snapshot (shared dicts; do not mutate)"""
+        return list(self.get_snapshot().trains)
     
     def get_trains_by_line(self, line: str) -> List[Dict]:
-        """Get trains for specific line"""
-        return [t for t in self.get_all_trains() if t["line"] == line]
+        """Get trains for specific line from the latest snapshot (shared dicts; do not mutate)"""
+        return list(self.get_snapshot().by_line.get(line, ()))
 
 multi_line_train_simulator = MultiLineTrainSimulator()
@@ -0,0 +1,134 @@
+import heapq
+import re
+from typing import Dict, List, Optional, Tuple
+from app.data.lines import LINE_AVG_SPEED_KMH
+
+STATION_DWELL_MINUTES = 1.0
+TRANSFER_PENALTY_MINUTES = 5.0
+
+class NetworkGraph:
+    """
+    Station graph over every line.
+
+    Nodes are station records (dense index 0..n-1). Consecutive stations on
+    a line are joined by running edges; records of the same physical station
+    on different lines (Rajiv Chowk, Kashmere Gate, New Delhi, ...) are joined
+    by transfer edges that carry a fixed time penalty. Interchanges whose two
+    sides have different names (Noida Sector 62 / Noida Sector 51) are paired
+    through their interchange_lines when the pairing is unambiguous.
+    """
+    
+    def __init__(self):
+        self.stations: List[Dict] = []
+        self.index_by_id: Dict[int, int] = {}
+        # adjacency[i] -> [(neighbour index, minutes, km, is_transfer)]
+        self.adjacency: List[List[Tuple[int, float, float, bool]]] = []
+    
+    def build(self, stations: List[Dict]):
+        """Build the adjacency structure once from the station list"""
+        self.stations = list(stations)
+        self.index_by_id = {s['id']: i for i, s in enumerate(self.stations)}
+        self.adjacency = [[] for _ in self.stations]
+        
+        by_line: Dict[str, List[int]] = {}
+        by_name: Dict[str, List[int]] = {}
+        for i, station in enumerate(self.stations):
+            by_line.setdefault(station['line'], []).append(i)
+            by_name.setdefault(self._physical_key(station['name']), []).append(i)
+        
+        for line, indexes in by_line.items():
+            indexes.sort(key=lambda i: self.stations[i]['distance_from_origin_km'])
+            speed = LINE_AVG_SPEED_KMH.get(line, 35)
+            for a, b in zip(indexes, indexes[1:]):
+                km = abs(self.stations[b]['distance_from_origin_km'] - self.stations[a]['distance_from_origin_km'])
+                minutes = km / speed * 60 + STATION_DWELL_MINUTES
+                self.adjacency[a].append((b, minutes, km, False))
+                self.adjacency[b].append((a, minutes, km, False))
+        
+        for indexes in by_name.values():
+            for a in indexes:
+                for b in indexes:
+                    if a != b and self.stations[a]['line'] != self.stations[b]['line']:
+                        self._add_transfer(a, b)
+        
+        for line_a in by_line:
+            for line_b in by_line:
+                if line_a < line_b:
+                    side_a = self._unlinked_interchanges(by_line[line_a], line_b)
+                    side_b = self._unlinked_interchanges(by_line[line_b], line_a)
+                    if len(side_a) == 1 and len(side_b) == 1:
+                        self._add_transfer(side_a[0], side_b[0])
+                        self._add_transfer(side_b[0], side_a[0])
+    
+    def _add_transfer(self, a: int, b: int):
+        self.adjacency[a].append((b, TRANSFER_PENALTY_MINUTES, 0.0, True))
+    
+    def _unlinked_interchanges(self, indexes: List[int], other_line: str) -> List[int]:
+        """Stations declaring an interchange with other_line that have no transfer edge to it yet"""
+        return [
+            i for i in indexes
+            if other_line in self.stations[i].get('interchange_lines', [])
+            and not any(t and self.stations[n]['line'] == other_line for n, _, _, t in self.adjacency[i])
+        ]
+    
+    @staticmethod
+    def _physical_key(name: str) -> str:
+        """Normalise a station name so records on different lines compare equal"""
+        return re.sub(r"\(.*?\)", "", name).strip().lower()
+    
+    def shortest_path(self, source_index: int, destination_index: int) -> Optional[Tuple[List[int], float]]:
+        """Dijkstra from source to destination; returns (node path, minutes)"""
+        best = {source_index: 0.0}
+        previous: Dict[int, int] = {}
+        heap = [(0.0, source_index)]
+        
+        while heap:
+            minutes, node = heapq.heappop(heap)
+            if node == destination_index:
+                path = [node]
+                while node != source_index:
+                    node = previous[node]
+                    path.append(node)
+                path.reverse()
+                return path, minutes
+            if minutes > best.get(node, float('inf')):
+                continue
+            for neighbour, edge_minutes, _, _ in self.adjacency[node]:
+                candidate = minutes + edge_minutes
+                if candidate < best.get(neighbour, float('inf')):
+                    best[neighbour] = candidate
+                    previous[neighbour] = node
+                    heapq.heappush(heap, (candidate, neighbour))
+        
+        return None
+    
+    def shortest_tree(self, source_index: int) -> Tuple[List[float], List[int], List[int]]:
+        """
+        Dijkstra from source to every node.
+
+        Returns (minutes, predecessor, settle order); unreachable nodes keep
+        infinite minutes and predecessor -1.
+        """
+        minutes = [float('inf')] * len(self.stations)
+        previous = [-1] * len(self.stations)
+        order = []
+        minutes[source_index] = 0.0
+        heap = [(0.0, source_index)]
+        
+        while heap:
+            current, node = heapq.heappop(heap)
+            if current > minutes[node]:
+                continue
+            order.append(node)
+            for neighbour, edge_minutes, _, _ in self.adjacency[node]:
+                candidate = current + edge_minutes
+                if candidate < minutes[neighbour]:
+                    minutes[neighbour] = candidate
+                    previous[neighbour] = node
+                    heapq.heappush(heap, (candidate, neighbour))
+        
+        return minutes, previous, order
+    
+    def edge(self, a: int, b: int) -> Tuple[int, float, float, bool]:
+        """Get the edge a -> b"""
+        return next(e for e in self.adjacency[a] if e[0] == b)
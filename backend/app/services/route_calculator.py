@@ -1,41 +1,63 @@
 from typing import Dict, List, Optional
+from app.data.lines import LINE_DIRECTIONS
+from app.services.fare_calculator import fare_calculator
+from app.services.network_graph import NetworkGraph
+from app.services.journey_table import JourneyTable
 
 class RouteCalculator:
     def __init__(self):
         self.stations = []
+        self.graph = NetworkGraph()
+        self.journeys = JourneyTable()
     
     def set_stations(self, stations: List[Dict]):
-        """Set stations data"""
-        self.stations = sorted(stations, key=lambda x: x['distance_from_origin_km'])
+        """Set stations data and rebuild the network graph and journey table"""
+        self.stations = stations
+        self.graph.build(stations)
+        self.journeys.build(self.graph)
+    
+    def has_station(self, station_id: int) -> bool:
+        return station_id in self.graph.index_by_id
     
     def calculate_route(self, source_id: int, destination_id: int) -> Optional[Dict]:
-        """Calculate route between two stations"""
-        source = next((s for s in self.stations if s['id'] == source_id), None)
-        destination = next((s for s in self.stations if s['id'] == destination_id), None)
+        """Look up the fastest route between two stations across all lines"""
+        source_index = self.graph.index_by_id.get(source_id)
+        destination_index = self.graph.index_by_id.get(destination_id)
+        
+        if source_index is None or destination_index is None:
+            return None
         
-        if not source or not destination:
+        path = self.journeys.path(source_index, destination_index)
+        if not path:
             return None
         
-        # Determine direction
-        direction = 'towards_huda' if destination_id > source_id else 'towards_samaypur'
+        return self._build_route(path)
+    
+    def _build_route(self, path: List[int]) -> Dict:
+        """Turn a node path into the route response"""
+        stations = self.graph.stations
+        source = stations[path[0]]
+        destination = stations[path[-1]]
         
-        # Get stations in route
-        if source_id < destination_id:
-            route_stations = [s for s in self.stations if source_id <= s['id'] <= destination_id]
-        else:
-            route_stations = [s for s in self.stations if destination_id <= s['id'] <= source_id]
-            route_stations.reverse()
+        origin, target = path[0], path[-1]
+        minutes = float(self.journeys.time_minutes[origin, target])
+        distance_km = float(self.journeys.distance_km[origin, target])
         
-        # Calculate distance
-        distance_km = abs(destination['distance_from_origin_km'] - source['distance_from_origin_km'])
+        route_stations = [source]
+        legs = []
+        leg_start = origin
         
-        # Calculate time (avg speed 35 km/h + 1 min per station)
-        travel_time = (distance_km / 35) * 60  # minutes
-        stop_time = len(route_stations) * 1  # 1 min per station
-        total_time = int(travel_time + stop_time)
+        for a, b in zip(path, path[1:]):
+            if self.graph.edge(a, b)[3]:
+                # Same physical station on another line: close the leg, don't list it twice
+                if a != leg_start:
+                    legs.append(self._leg(leg_start, a))
+                leg_start = b
+                continue
+            route_stations.append(stations[b])
         
-        # Calculate fare
-        fare = self._calculate_fare(distance_km)
+        if path[-1] != leg_start:
+            legs.append(self._leg(leg_start, path[-1]))
         
         # Find interchange stations
         interchange_stations = [s for s in route_stations if s['is_interchange']]
@@ -54,25 +76,25 @@ class RouteCalculator:
             'stations': route_stations,
             'total_stations': len(route_stations),
             'total_distance_km': round(distance_km, 2),
-            'estimated_time_minutes': total_time,
-            'fare': fare,
-            'direction': direction,
-            'interchange_stations': [s['name'] for s in interchange_stations]
+            'estimated_time_minutes': int(minutes),
+            'fare': fare_calculator.fare(source['id'], destination['id']),
+            'direction': legs[0]['direction'] if legs else 'same_station',
+            'interchange_stations': [s['name'] for s in interchange_stations],
+            'transfers': int(self.journeys.transfers[origin, target]),
+            'legs': legs
         }
     
-    def _calculate_fare(self, distance_km: float) -> int:
-        """Calculate fare based on distance"""
-        if distance_km <= 2:
-            return 10
-        elif distance_km <= 5:
-            return 20
-        elif distance_km <= 12:
-            return 30
-        elif distance_km <= 21:
-            return 40
-        elif distance_km <= 32:
-            return 50
-        else:
-            return 60
+    def _leg(self, start: int, end: int) -> Dict:
+        """Describe a ride on a single line"""
+        origin = self.graph.stations[start]
+        target = self.graph.stations[end]
+        forward, backward = LINE_DIRECTIONS.get(origin['line'], ('forward', 'backward'))
+        
+        return {
+            'line': origin['line'],
+            'direction': forward if target['distance_from_origin_km'] > origin['distance_from_origin_km'] else backward,
+            'from_station': {'id': origin['id'], 'name': origin['name']},
+            'to_station': {'id': target['id'], 'name': target['name']}
+        }
 
 route_calculator = RouteCalculator()
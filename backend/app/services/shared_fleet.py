@@ -0,0 +1,198 @@
+import time
+import numpy as np
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+FLEET_MAGIC = b"DMRF"
+FLEET_VERSION = 2
+
+# seq is odd while the publisher is writing and even once the block is consistent;
+# generation is set once per block, so readers can tell a recreated block from the one they hold
+FLEET_HEADER = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u4"),
+    ("generation", "<u8"),
+    ("seq", "<u8"),
+    ("tick", "<u8"),
+    ("count", "<u4"),
+    ("capacity", "<u4"),
+    ("timestamp", "S32")
+])
+
+# Column layout after the header, each sized for `capacity` trains
+FLEET_COLUMNS = (
+    ("train_id", "S16"),
+    ("line_index", "<i2"),
+    ("position", "<f8"),
+    ("direction", "i1"),
+    ("speed", "<i2"),
+    ("status", "i1"),
+    ("passengers", "<i4"),
+    ("capacity", "<i4")
+)
+
+# Reads retried while the publisher is mid-write before settling for the last good copy
+MAX_READ_ATTEMPTS = 100
+
+# How long seq may stand still before a reader checks whether the block was recreated
+DEFAULT_STALE_AFTER_SECONDS = 10.0
+
+@dataclass(frozen=True)
+class FleetState:
+    """Consistent copy of the shared fleet block at one tick"""
+    generation: int
+    seq: int
+    tick: int
+    timestamp: str
+    train_ids: Tuple[str, ...]
+    columns: Mapping[str, np.ndarray]
+
+def _layout(capacity: int) -> Tuple[Dict[str, Tuple[int, np.dtype]], int]:
+    """Byte offset of every column (8-byte aligned) and the total block size"""
+    offsets = {}
+    offset = FLEET_HEADER.itemsize
+    for name, dtype in FLEET_COLUMNS:
+        offset = (offset + 7) & ~7
+        offsets[name] = (offset, np.dtype(dtype))
+        offset += np.dtype(dtype).itemsize * capacity
+    return offsets, offset
+
+def _views(buf, capacity: int):
+    header = np.ndarray((), dtype=FLEET_HEADER, buffer=buf)
+    offsets, _ = _layout(capacity)
+    columns = {
+        name: np.ndarray((capacity,), dtype=dtype, buffer=buf, offset=offset)
+        for name, (offset, dtype) in offsets.items()
+    }
+    return header, columns
+
+class SharedFleetWriter:
+    """Publisher side: owns the shared memory block and rewrites it every tick"""
+
+    def __init__(self, name: str, capacity: int):
+        _, size = _layout(capacity)
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.capacity = capacity
+        self.header, self.columns = _views(self.shm.buf, capacity)
+        self.header["magic"] = FLEET_MAGIC
+        self.header["version"] = FLEET_VERSION
+        self.header["capacity"] = capacity
+        self.header["seq"] = 0
+        self.header["generation"] = time.time_ns()
+
+    def write(self, tick: int, timestamp: str, train_ids: Sequence[str], columns: Mapping[str, np.ndarray]):
+        count = len(train_ids)
+        if count > self.capacity:
+            raise ValueError(f"Fleet of {count} trains exceeds shared block capacity {self.capacity}")
+
+        self.header["seq"] += 1
+        self.header["tick"] = tick
+        self.header["count"] = count
+        self.header["timestamp"] = timestamp.encode("ascii")
+        self.columns["train_id"][:count] = train_ids
+        for name, column in self.columns.items():
+            if name != "train_id":
+                column[:count] = columns[name]
+        self.header["seq"] += 1
+
+    def close(self):
+        del self.header, self.columns
+        self.shm.close()
+        self.shm.unlink()
+
+class SharedFleetReader:
+    """
+    Worker side: attaches to the block on first use and reads it under the seqlock.
+
+    A read only copies the columns when seq moved since the previous read, so
+    between ticks it costs one header load however many workers are reading.
+
+    A restarted publisher unlinks the block and creates a new one under the
+    same name, leaving this process mapped to the orphaned copy. So when seq
+    has not moved for stale_after_seconds, the reader opens the name again
+    and switches over if the block there has a different generation.
+    """
+
+    def __init__(self, name: str, stale_after_seconds: float = DEFAULT_STALE_AFTER_SECONDS):
+        self.name = name
+        self.stale_after_seconds = stale_after_seconds
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.generation: Optional[int] = None
+        self._state: Optional[FleetState] = None
+        self._last_seq = -1
+        self._seq_moved_at = 0.0
+
+    def _attach(self) -> bool:
+        """Map the block currently under name, unless it is the one already attached"""
+        try:
+            shm = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            return False
+        # Attaching registers the block with this process's resource tracker,
+        # which would unlink it on exit; the publisher owns its lifetime
+        resource_tracker.unregister(shm._name, "shared_memory")
+        header = np.ndarray((), dtype=FLEET_HEADER, buffer=shm.buf)
+        generation = int(header["generation"])
+        capacity = int(header["capacity"])
+        del header
+        if self.shm is not None and generation == self.generation:
+            shm.close()
+            return False
+
+        self._detach()
+        self.shm = shm
+        self.generation = generation
+        self.header, self.columns = _views(shm.buf, capacity)
+        self._seq_moved_at = time.monotonic()
+        return True
+
+    def _detach(self):
+        if self.shm is not None:
+            # The views must go before the mapping can be closed
+            del self.header, self.columns
+            self.shm.close()
+            self.shm = None
+
+    def read(self) -> Optional[FleetState]:
+        """Latest consistent fleet state, or None before the publisher has written one"""
+        if self.shm is None and not self._attach():
+            return None
+
+        now = time.monotonic()
+        seq = int(self.header["seq"])
+        if seq != self._last_seq:
+            self._last_seq = seq
+            self._seq_moved_at = now
+        elif now - self._seq_moved_at > self.stale_after_seconds:
+            self._seq_moved_at = now
+            if self._attach():
+                print(f"Shared fleet block '{self.name}' was recreated; re-attached")
+
+        for _ in range(MAX_READ_ATTEMPTS):
+            seq = int(self.header["seq"])
+            if seq & 1 or seq == 0:
+                continue
+            if self._state and self._state.generation == self.generation and seq == self._state.seq:
+                return self._state
+
+            count = int(self.header["count"])
+            tick = int(self.header["tick"])
+            timestamp = self.header["timestamp"].item().decode("ascii")
+            columns = {name: column[:count].copy() for name, column in self.columns.items()}
+            if int(self.header["seq"]) != seq:
+                continue
+
+            train_ids = tuple(train_id.decode("ascii") for train_id in columns.pop("train_id").tolist())
+            for column in columns.values():
+                column.setflags(write=False)
+            self._state = FleetState(self.generation, seq, tick, timestamp, train_ids, columns)
+            return self._state
+
+        return self._state
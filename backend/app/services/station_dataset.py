@@ -0,0 +1,214 @@
+import hashlib
+import importlib
+import importlib.util
+import json
+import mmap
+import os
+import struct
+import numpy as np
+from pathlib import Path
+from typing import List, Dict, Optional
+
+DATASET_MAGIC = b"DMRS"
+DATASET_FORMAT_VERSION = 1
+
+# magic, format version, reserved, JSON header length
+DATASET_PREAMBLE = struct.Struct("<4sHHI")
+
+DATASET_PATH = Path(__file__).parent.parent / "data" / "compiled" / "stations.bin"
+
+# (module, list name) of the literal station data, in line order
+STATION_SOURCES = (
+    ("app.data.yellow_line_stations", "YELLOW_LINE_STATIONS"),
+    ("app.data.blue_line_stations", "BLUE_LINE_STATIONS"),
+    ("app.data.violet_line_stations", "VIOLET_LINE_STATIONS"),
+    ("app.data.orange_line_stations", "ORANGE_LINE_STATIONS"),
+    ("app.data.aqua_line_stations", "AQUA_LINE_STATIONS")
+)
+
+# Fixed-width columns: (column, dtype, path into the station dict)
+NUMERIC_COLUMNS = (
+    ("id", "<i4", ("id",)),
+    ("latitude", "<f8", ("coordinates", "latitude")),
+    ("longitude", "<f8", ("coordinates", "longitude")),
+    ("distance_from_origin_km", "<f8", ("distance_from_origin_km",)),
+    ("opened_year", "<i2", ("opened_year",)),
+    ("is_interchange", "u1", ("is_interchange",)),
+    ("importance_score", "<i2", ("importance_score",)),
+    ("crowd_peak", "<f8", ("avg_crowd_multiplier", "peak")),
+    ("crowd_offpeak", "<f8", ("avg_crowd_multiplier", "offpeak")),
+    ("crowd_weekend", "<f8", ("avg_crowd_multiplier", "weekend"))
+)
+
+# Columns holding an index into the shared string table
+STRING_COLUMNS = ("station_id", "name", "display_name", "line", "layout", "station_type")
+
+# Columns holding a list of strings (offsets into a flat list of string indexes)
+STRING_LIST_COLUMNS = ("interchange_lines", "facilities")
+
+def data_version(stations: List[Dict]) -> str:
+    """Content hash of the station data, stable across the literal and compiled forms"""
+    canonical = json.dumps(stations, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+def load_source_stations() -> List[Dict]:
+    """Import the literal station modules (the slow path the artifact replaces)"""
+    stations = []
+    for module_name, attribute in STATION_SOURCES:
+        stations.extend(getattr(importlib.import_module(module_name), attribute))
+    return stations
+
+def source_files() -> List[Path]:
+    return [Path(importlib.util.find_spec(module_name).origin) for module_name, _ in STATION_SOURCES]
+
+def compile_dataset(stations: List[Dict], path: Path = DATASET_PATH) -> Dict:
+    """Write the stations as one columnar artifact; returns its JSON header"""
+    strings: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+
+    blobs: Dict[str, np.ndarray] = {}
+    for column, dtype, keys in NUMERIC_COLUMNS:
+        values = []
+        for station in stations:
+            value = station
+            for key in keys:
+                value = value[key]
+            values.append(value)
+        blobs[column] = np.asarray(values, dtype=dtype)
+
+    for column in STRING_COLUMNS:
+        blobs[column] = np.asarray([intern(s[column]) for s in stations], dtype="<u2")
+
+    for column in STRING_LIST_COLUMNS:
+        offsets = [0]
+        values = []
+        for station in stations:
+            values.extend(intern(value) for value in station[column])
+            offsets.append(len(values))
+        blobs[f"{column}_offsets"] = np.asarray(offsets, dtype="<u4")
+        blobs[f"{column}_values"] = np.asarray(values, dtype="<u2")
+
+    encoded = [value.encode("utf-8") for value in strings]
+    blobs["string_offsets"] = np.cumsum([0] + [len(value) for value in encoded], dtype="<u4")
+    blobs["string_bytes"] = np.frombuffer(b"".join(encoded), dtype="u1")
+
+    # Column offsets are relative to the end of the JSON header, 8-byte aligned
+    columns = {}
+    offset = 0
+    for column, array in blobs.items():
+        offset = (offset + 7) & ~7
+        columns[column] = [array.dtype.str, offset, len(array)]
+        offset += array.nbytes
+
+    header = {
+        "data_version": data_version(stations),
+        "count": len(stations),
+        "columns": columns
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    header_bytes += b" " * (-(DATASET_PREAMBLE.size + len(header_bytes)) % 8)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    body = bytearray(offset)
+    for column, array in blobs.items():
+        start = columns[column][1]
+        body[start:start + array.nbytes] = array.tobytes()
+
+    temporary = path.with_suffix(".tmp")
+    with open(temporary, "wb") as f:
+        f.write(DATASET_PREAMBLE.pack(DATASET_MAGIC, DATASET_FORMAT_VERSION, 0, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(body)
+    os.replace(temporary, path)
+    return header
+
+class StationDataset:
+    """
+    Memory-mapped view of a compiled station artifact.
+
+    Columns are NumPy arrays over the mapping, so opening the file reads
+    only its header; pages are faulted in as columns are touched.
+    """
+
+    def __init__(self, path: Path = DATASET_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, format_version, _, header_length = DATASET_PREAMBLE.unpack_from(self._mmap)
+        if magic != DATASET_MAGIC or format_version != DATASET_FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {DATASET_FORMAT_VERSION} station dataset")
+
+        body = DATASET_PREAMBLE.size + header_length
+        header = json.loads(self._mmap[DATASET_PREAMBLE.size:body])
+        self.version: str = header["data_version"]
+        self.count: int = header["count"]
+        self.columns: Dict[str, np.ndarray] = {
+            column: np.frombuffer(self._mmap, dtype=dtype, count=length, offset=body + offset)
+            for column, (dtype, offset, length) in header["columns"].items()
+        }
+        self._strings: Optional[List[str]] = None
+
+    @property
+    def strings(self) -> List[str]:
+        if self._strings is None:
+            offsets = self.columns["string_offsets"].tolist()
+            data = self.columns["string_bytes"].tobytes()
+            self._strings = [
+                data[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])
+            ]
+        return self._strings
+
+    def string_lists(self, column: str) -> List[List[str]]:
+        strings = self.strings
+        offsets = self.columns[f"{column}_offsets"].tolist()
+        values = self.columns[f"{column}_values"].tolist()
+        return [[strings[i] for i in values[start:end]] for start, end in zip(offsets, offsets[1:])]
+
+    def to_dicts(self) -> List[Dict]:
+        """Rebuild the station dicts exactly as the literal modules define them"""
+        strings = self.strings
+        numeric = {column: self.columns[column].tolist() for column, _, _ in NUMERIC_COLUMNS}
+        text = {column: [strings[i] for i in self.columns[column].tolist()] for column in STRING_COLUMNS}
+        interchange_lines = self.string_lists("interchange_lines")
+        facilities = self.string_lists("facilities")
+
+        return [
+            {
+                "id": numeric["id"][i],
+                "station_id": text["station_id"][i],
+                "name": text["name"][i],
+                "display_name": text["display_name"][i],
+                "line": text["line"][i],
+                "coordinates": {"latitude": numeric["latitude"][i], "longitude": numeric["longitude"][i]},
+                "distance_from_origin_km": numeric["distance_from_origin_km"][i],
+                "layout": text["layout"][i],
+                "opened_year": numeric["opened_year"][i],
+                "is_interchange": bool(numeric["is_interchange"][i]),
+                "interchange_lines": interchange_lines[i],
+                "facilities": facilities[i],
+                "importance_score": numeric["importance_score"][i],
+                "station_type": text["station_type"][i],
+                "avg_crowd_multiplier": {
+                    "peak": numeric["crowd_peak"][i],
+                    "offpeak": numeric["crowd_offpeak"][i],
+                    "weekend": numeric["crowd_weekend"][i]
+                }
+            }
+            for i in range(self.count)
+        ]
+
+def open_dataset(path: Path = DATASET_PATH) -> Optional[StationDataset]:
+    """The compiled artifact if it is present and newer than the literal modules, else None"""
+    try:
+        built = path.stat().st_mtime
+        if all(source.stat().st_mtime <= built for source in source_files()):
+            return StationDataset(path)
+        print(f"⚠️  {path.name} is older than the station data; run scripts/build_station_dataset.py")
+    except FileNotFoundError:
+        pass
+    except ValueError as e:
+        print(f"⚠️  Ignoring station dataset: {e}")
+    return None
@@ -0,0 +1,127 @@
+import math
+import numpy as np
+from typing import List, Dict, Sequence, Tuple
+
+EARTH_RADIUS_M = 6371008.8
+
+# Cells are sized to hold about this many stations on average
+STATIONS_PER_CELL = 4
+MIN_CELL_SIZE_M = 250.0
+
+def haversine_m(lat1: float, lon1: float, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Great-circle distance in metres from one point to many"""
+    lat1, lon1, lat2, lon2 = np.radians(lat1), np.radians(lon1), np.radians(lat2), np.radians(lon2)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+class StationGeoIndex:
+    """
+    Uniform grid over equirectangular-projected station coordinates.
+
+    Stations are sorted by cell so each cell is one slice of the coordinate
+    arrays. A query walks rings of cells outward from the query point and
+    stops once no unvisited cell can hold anything closer than the k-th
+    candidate (or the radius is exhausted); only those candidates get an
+    exact haversine distance.
+    """
+
+    def __init__(self):
+        self.order = np.empty(0, dtype=np.int64)
+        self.latitudes = np.empty(0)
+        self.longitudes = np.empty(0)
+        self._x = np.empty(0)
+        self._y = np.empty(0)
+        self.cells: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self.cell_size_m = MIN_CELL_SIZE_M
+        self._cos_lat0 = 1.0
+        self._extent = (0, 0, 0, 0)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def build(self, latitudes: Sequence[float], longitudes: Sequence[float]):
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        if len(latitudes) == 0:
+            self.__init__()
+            return
+
+        self._cos_lat0 = math.cos(math.radians(float(latitudes.mean())))
+        x, y = self._project(latitudes, longitudes)
+        area = max((x.max() - x.min()) * (y.max() - y.min()), 1.0)
+        self.cell_size_m = max(MIN_CELL_SIZE_M, math.sqrt(area * STATIONS_PER_CELL / len(x)))
+
+        cx = np.floor(x / self.cell_size_m).astype(np.int64)
+        cy = np.floor(y / self.cell_size_m).astype(np.int64)
+        self.order = np.lexsort((cy, cx))
+        self.latitudes = latitudes[self.order]
+        self.longitudes = longitudes[self.order]
+        self._x = x[self.order]
+        self._y = y[self.order]
+
+        cx, cy = cx[self.order], cy[self.order]
+        starts = np.flatnonzero(np.r_[True, (cx[1:] != cx[:-1]) | (cy[1:] != cy[:-1])])
+        ends = np.r_[starts[1:], len(cx)]
+        self.cells = {
+            (int(cx[s]), int(cy[s])): (int(s), int(e)) for s, e in zip(starts, ends)
+        }
+        self._extent = (int(cx.min()), int(cx.max()), int(cy.min()), int(cy.max()))
+
+    def _project(self, latitudes, longitudes):
+        x = np.radians(longitudes) * EARTH_RADIUS_M * self._cos_lat0
+        y = np.radians(latitudes) * EARTH_RADIUS_M
+        return x, y
+
+    def _ring(self, cx: int, cy: int, r: int) -> List[Tuple[int, int]]:
+        """Occupied cell slices at Chebyshev distance r from (cx, cy)"""
+        if r == 0:
+            keys = [(cx, cy)]
+        else:
+            keys = [(cx + dx, cy + dy) for dx in range(-r, r + 1) for dy in (-r, r)]
+            keys += [(cx + dx, cy + dy) for dx in (-r, r) for dy in range(-r + 1, r)]
+        return [self.cells[key] for key in keys if key in self.cells]
+
+    def nearest(self, latitude: float, longitude: float, k: int, radius_m: float) -> List[Tuple[int, float]]:
+        """Up to k (station row, distance in metres) pairs within radius_m, nearest first"""
+        if not len(self.order):
+            return []
+
+        x, y = self._project(latitude, longitude)
+        cx = math.floor(x / self.cell_size_m)
+        cy = math.floor(y / self.cell_size_m)
+        min_x, max_x, min_y, max_y = self._extent
+        max_ring = max(abs(cx - min_x), abs(cx - max_x), abs(cy - min_y), abs(cy - max_y))
+
+        row_parts: List[np.ndarray] = []
+        distance_parts: List[np.ndarray] = []
+        found = 0
+        r = 0
+        while r <= max_ring:
+            for start, end in self._ring(cx, cy, r):
+                row_parts.append(np.arange(start, end))
+                distance_parts.append(np.hypot(self._x[start:end] - x, self._y[start:end] - y))
+                found += end - start
+            # Anything in ring r + 1 or beyond is at least r cells away
+            reach = r * self.cell_size_m
+            if reach > radius_m:
+                break
+            if found >= k and np.partition(np.concatenate(distance_parts), k - 1)[k - 1] <= reach:
+                break
+            r += 1
+
+        if not row_parts:
+            return []
+        rows = np.concatenate(row_parts)
+        distances = haversine_m(latitude, longitude, self.latitudes[rows], self.longitudes[rows])
+        within = np.flatnonzero(distances <= radius_m)
+        best = within[np.argsort(distances[within], kind="stable")[:k]]
+        return [(int(self.order[rows[i]]), float(distances[i])) for i in best]
+
+    @classmethod
+    def from_stations(cls, stations: List[Dict]) -> "StationGeoIndex":
+        index = cls()
+        index.build(
+            [s['coordinates']['latitude'] for s in stations],
+            [s['coordinates']['longitude'] for s in stations]
+        )
+        return index
@@ -0,0 +1,65 @@
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional, Tuple
+
+class StationRegistry:
+    """
+    Station indexes built once at load time.
+
+    Lookups by numeric id, station code (YL16, BL01), line and position along
+    the line are dict or list indexing; every station also knows its
+    previous and next neighbour on its line.
+    """
+
+    def __init__(self, stations: List[Dict]):
+        self.stations = stations
+        self.by_id: Mapping[int, Dict] = MappingProxyType({s['id']: s for s in stations})
+        self.by_code: Mapping[str, Dict] = MappingProxyType({s['station_id'].upper(): s for s in stations})
+
+        by_line: Dict[str, List[Dict]] = {}
+        for station in stations:
+            by_line.setdefault(station['line'], []).append(station)
+        for line_stations in by_line.values():
+            line_stations.sort(key=lambda s: (s['distance_from_origin_km'], s['id']))
+        self.by_line: Mapping[str, List[Dict]] = MappingProxyType(by_line)
+
+        # station id -> (line, index along the line)
+        self.line_position: Mapping[int, Tuple[str, int]] = MappingProxyType({
+            station['id']: (line, index)
+            for line, line_stations in by_line.items()
+            for index, station in enumerate(line_stations)
+        })
+        self.interchanges: List[Dict] = [s for s in stations if s['is_interchange']]
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def get(self, station_id: int) -> Optional[Dict]:
+        return self.by_id.get(station_id)
+
+    def get_by_code(self, code: str) -> Optional[Dict]:
+        return self.by_code.get(code.upper())
+
+    def line(self, line: str) -> List[Dict]:
+        """Stations of a line in order from its origin, or an empty list"""
+        return self.by_line.get(line, [])
+
+    def neighbours(self, station_id: int) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """(previous, next) station on the same line; None past either terminal"""
+        line, index = self.line_position[station_id]
+        line_stations = self.by_line[line]
+        previous_station = line_stations[index - 1] if index > 0 else None
+        next_station = line_stations[index + 1] if index + 1 < len(line_stations) else None
+        return previous_station, next_station
+
+    def detail(self, station_id: int) -> Optional[Dict]:
+        """Station with its line neighbours, shaped like StationDetailResponse"""
+        station = self.by_id.get(station_id)
+        if not station:
+            return None
+
+        previous_station, next_station = self.neighbours(station_id)
+        return {
+            "station": station,
+            "previous_station": previous_station,
+            "next_station": next_station
+        }
@@ -0,0 +1,140 @@
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import List, Dict, Set, Tuple
+
+# Match tiers, best first
+TIER_PREFIX = 0        # the name starts with the query
+TIER_WORD_PREFIX = 1   # a later word of the name starts with the query
+TIER_SUBSTRING = 2     # the query appears inside the name
+TIER_FUZZY = 3         # the query is one edit away from a word-aligned prefix
+
+# Shorter queries only get prefix matches; fuzzy matching needs a few characters
+MIN_SUBSTRING_LENGTH = 3
+MIN_FUZZY_LENGTH = 4
+
+SEARCH_CACHE_SIZE = 1024
+
+def normalize(text: str) -> str:
+    """Lowercase, with punctuation and brackets folded into single spaces"""
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", text.lower()).split())
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def within_one_edit_of_prefix(query: str, text: str) -> bool:
+    """True if some prefix of text is at most one insert, delete or substitution from query"""
+    i = 0
+    limit = min(len(query), len(text))
+    while i < limit and query[i] == text[i]:
+        i += 1
+    if i == len(query):
+        return True
+    rest = query[i + 1:]
+    return (
+        text.startswith(rest, i + 1)                         # substitution
+        or text.startswith(rest, i)                          # extra character in the query
+        or text.startswith(query[i:], i + 1)                 # character missing from the query
+    )
+
+class StationSearchIndex:
+    """
+    Autocomplete index over station names, built once per station data version.
+
+    A prefix trie answers name and word prefixes, trigram postings narrow
+    substring and one-typo candidates before they are checked, and results
+    are ranked by match tier, then importance_score.
+    """
+
+    def __init__(self):
+        self.stations: List[Dict] = []
+        self.version = 0
+        self._trie: Dict = {}
+        self._substring_postings: Dict[str, Set[int]] = {}
+        self._fuzzy_postings: Dict[str, Set[int]] = {}
+        self._keys: List[Tuple[str, ...]] = []
+        self._words: List[Tuple[str, ...]] = []
+        self._cached_search = lru_cache(maxsize=SEARCH_CACHE_SIZE)(self._search)
+
+    def build(self, stations: List[Dict]):
+        self.stations = stations
+        self.version += 1
+        self._trie = {}
+        self._substring_postings = {}
+        self._fuzzy_postings = {}
+        self._keys = []
+        self._words = []
+
+        for index, station in enumerate(stations):
+            keys = tuple(dict.fromkeys(
+                key for key in (normalize(station['name']), normalize(station.get('display_name', ''))) if key
+            ))
+            # Every word-aligned suffix, e.g. "hauz khas" and "khas"
+            words = tuple(dict.fromkeys(
+                " ".join(parts[start:])
+                for parts in (key.split(" ") for key in keys)
+                for start in range(len(parts))
+            ))
+            self._keys.append(keys)
+            self._words.append(words)
+
+            for key in keys:
+                self._insert(key, index, TIER_PREFIX)
+                for gram in trigrams(key):
+                    self._substring_postings.setdefault(gram, set()).add(index)
+            for word in words:
+                self._insert(word, index, TIER_WORD_PREFIX)
+                for gram in trigrams("  " + word):
+                    self._fuzzy_postings.setdefault(gram, set()).add(index)
+
+        # Cached results belong to the previous data version
+        self._cached_search.cache_clear()
+
+    def _insert(self, key: str, index: int, tier: int):
+        node = self._trie
+        for char in key:
+            node = node.setdefault(char, {})
+            matches = node.setdefault(None, {})
+            matches[index] = min(tier, matches.get(index, tier))
+
+    def search(self, query: str, limit: int) -> Tuple[int, Tuple[Dict, ...]]:
+        """(total matches, best `limit` stations) for a query; cached per normalized query and limit"""
+        return self._cached_search(normalize(query), limit)
+
+    def _search(self, query: str, limit: int) -> Tuple[int, Tuple[Dict, ...]]:
+        if not query:
+            return 0, ()
+
+        matches: Dict[int, int] = {}
+        node = self._trie
+        for char in query:
+            node = node.get(char)
+            if node is None:
+                break
+        else:
+            matches.update(node[None])
+
+        if len(query) >= MIN_SUBSTRING_LENGTH:
+            postings = [self._substring_postings.get(gram, set()) for gram in trigrams(query)]
+            for index in set.intersection(*postings):
+                if index not in matches and any(query in key for key in self._keys[index]):
+                    matches[index] = TIER_SUBSTRING
+
+        if len(query) >= MIN_FUZZY_LENGTH:
+            # One edit touches at most three of the query's trigrams
+            grams = trigrams("  " + query)
+            shared = Counter(
+                index for gram in grams for index in self._fuzzy_postings.get(gram, ())
+            )
+            threshold = max(1, len(grams) - 3)
+            for index, count in shared.items():
+                if count >= threshold and index not in matches and any(
+                    within_one_edit_of_prefix(query, word) for word in self._words[index]
+                ):
+                    matches[index] = TIER_FUZZY
+
+        ranked = sorted(
+            matches,
+            key=lambda i: (matches[i], -self.stations[i]['importance_score'], self.stations[i]['name'])
+        )
+        return len(ranked), tuple(self.stations[i] for i in ranked[:limit])
@@ -0,0 +1,179 @@
+import sys
+import numpy as np
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from app.services.station_dataset import (
+    NUMERIC_COLUMNS, STRING_COLUMNS, STRING_LIST_COLUMNS,
+    StationDataset, data_version, load_source_stations, open_dataset
+)
+
+# Keys of a station row, in the order the station data defines them
+STATION_KEYS = (
+    "id", "station_id", "name", "display_name", "line", "coordinates",
+    "distance_from_origin_km", "layout", "opened_year", "is_interchange",
+    "interchange_lines", "facilities", "importance_score", "station_type",
+    "avg_crowd_multiplier"
+)
+
+class StationRow(Mapping):
+    """
+    Read-only mapping view of one station in a StationStore.
+
+    Rows hold only the store and a row number; values are read from the
+    store's columns on access, so routes, services and JSON encoding can
+    treat a row like the station dict it replaces.
+    """
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "StationStore", row: int):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, key: str):
+        getter = FIELD_GETTERS.get(key)
+        if getter is None:
+            raise KeyError(key)
+        return getter(self._store, self._row)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(STATION_KEYS)
+
+    def __len__(self) -> int:
+        return len(STATION_KEYS)
+
+    def __repr__(self) -> str:
+        return f"StationRow({self._store.station_codes[self._row]}, {self._store.names[self._row]!r})"
+
+FIELD_GETTERS: Dict[str, Callable[["StationStore", int], object]] = {
+    "id": lambda s, i: int(s.ids[i]),
+    "station_id": lambda s, i: s.station_codes[i],
+    "name": lambda s, i: s.names[i],
+    "display_name": lambda s, i: s.display_names[i],
+    "line": lambda s, i: s.lines[i],
+    "coordinates": lambda s, i: s.coordinates[i],
+    "distance_from_origin_km": lambda s, i: float(s.distances_km[i]),
+    "layout": lambda s, i: s.layouts[i],
+    "opened_year": lambda s, i: int(s.opened_years[i]),
+    "is_interchange": lambda s, i: bool(s.is_interchange[i]),
+    "interchange_lines": lambda s, i: s.interchange_lines[i],
+    "facilities": lambda s, i: s.facilities[i],
+    "importance_score": lambda s, i: int(s.importance_scores[i]),
+    "station_type": lambda s, i: s.station_types[i],
+    "avg_crowd_multiplier": lambda s, i: s.crowd_multiplier_maps[i]
+}
+
+class StationStore:
+    """
+    The one immutable copy of the station data, shared by every service.
+
+    Numeric fields are NumPy columns (views over the memory-mapped dataset
+    when it is built), strings are interned once, and list fields share
+    identical tuples between stations. The nested coordinates and
+    avg_crowd_multiplier of each station are read-only mappings built once,
+    so reading a row allocates nothing for them. rows holds a StationRow
+    per station.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], strings: Dict[str, List[str]],
+                 string_lists: Dict[str, List[Tuple[str, ...]]], version: str, source: str):
+        self.version = version
+        self.source = source
+
+        self.ids = columns["id"]
+        self.latitudes = columns["latitude"]
+        self.longitudes = columns["longitude"]
+        self.distances_km = columns["distance_from_origin_km"]
+        self.opened_years = columns["opened_year"]
+        self.is_interchange = columns["is_interchange"].astype(bool)
+        self.importance_scores = columns["importance_score"]
+        # peak, offpeak, weekend
+        self.crowd_multipliers = np.column_stack(
+            [columns["crowd_peak"], columns["crowd_offpeak"], columns["crowd_weekend"]]
+        )
+        for column in (self.is_interchange, self.crowd_multipliers):
+            column.setflags(write=False)
+
+        self.station_codes = strings["station_id"]
+        self.names = strings["name"]
+        self.display_names = strings["display_name"]
+        self.lines = strings["line"]
+        self.layouts = strings["layout"]
+        self.station_types = strings["station_type"]
+        self.interchange_lines = string_lists["interchange_lines"]
+        self.facilities = string_lists["facilities"]
+
+        self.coordinates: List[Mapping[str, float]] = [
+            MappingProxyType({"latitude": latitude, "longitude": longitude})
+            for latitude, longitude in zip(self.latitudes.tolist(), self.longitudes.tolist())
+        ]
+        self.crowd_multiplier_maps: List[Mapping[str, float]] = [
+            MappingProxyType({"peak": peak, "offpeak": offpeak, "weekend": weekend})
+            for peak, offpeak, weekend in self.crowd_multipliers.tolist()
+        ]
+
+        self.rows: List[StationRow] = [StationRow(self, i) for i in range(len(self.ids))]
+        self.row_by_id: Dict[int, int] = {station_id: i for i, station_id in enumerate(self.ids.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get(self, station_id: int) -> Optional[StationRow]:
+        row = self.row_by_id.get(station_id)
+        return None if row is None else self.rows[row]
+
+    @classmethod
+    def from_dataset(cls, dataset: StationDataset) -> "StationStore":
+        strings = [sys.intern(s) for s in dataset.strings]
+        tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        return cls(
+            columns={column: dataset.columns[column] for column, _, _ in NUMERIC_COLUMNS},
+            strings={
+                column: [strings[i] for i in dataset.columns[column].tolist()]
+                for column in STRING_COLUMNS
+            },
+            string_lists={
+                column: [tuples.setdefault(tuple(values), tuple(values)) for values in dataset.string_lists(column)]
+                for column in STRING_LIST_COLUMNS
+            },
+            version=dataset.version,
+            source="compiled"
+        )
+
+    @classmethod
+    def from_dicts(cls, stations: List[Dict]) -> "StationStore":
+        columns = {}
+        for column, dtype, keys in NUMERIC_COLUMNS:
+            values = []
+            for station in stations:
+                value = station
+                for key in keys:
+                    value = value[key]
+                values.append(value)
+            columns[column] = np.asarray(values, dtype=dtype)
+            columns[column].setflags(write=False)
+
+        tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        return cls(
+            columns=columns,
+            strings={column: [sys.intern(s[column]) for s in stations] for column in STRING_COLUMNS},
+            string_lists={
+                column: [
+                    tuples.setdefault(values, values)
+                    for values in (tuple(sys.intern(v) for v in s[column]) for s in stations)
+                ]
+                for column in STRING_LIST_COLUMNS
+            },
+            version=data_version(stations),
+            source="literal"
+        )
+
+    @classmethod
+    def load(cls) -> "StationStore":
+        """From the compiled dataset when it is current, else from the station data modules"""
+        dataset = open_dataset()
+        if dataset:
+            return cls.from_dataset(dataset)
+        return cls.from_dicts(load_source_stations())
+
+station_store = StationStore.load()
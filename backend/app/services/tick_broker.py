@@ -0,0 +1,104 @@
+import asyncio
+import os
+import struct
+from typing import AsyncIterator, Optional, Set
+
+# Every message is a u32 little-endian length followed by that many bytes
+MESSAGE_LENGTH = struct.Struct("<I")
+
+# A subscriber this far behind is disconnected; it reconnects and starts from the latest tick
+MAX_SUBSCRIBER_BUFFER_BYTES = 8 * 1024 * 1024
+
+RECONNECT_DELAY_SECONDS = 1.0
+
+class TickPublisher:
+    """
+    Unix domain socket broker run by the single simulator process.
+
+    Web workers connect as subscribers and receive every published message;
+    a new subscriber gets the latest message straight away so it can serve
+    clients before the next tick.
+    """
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.subscribers: Set[asyncio.StreamWriter] = set()
+        self.latest: Optional[bytes] = None
+        self.messages_published = 0
+        self.subscribers_dropped = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._on_subscriber, path=self.socket_path)
+        print(f"Tick publisher listening on {self.socket_path}")
+
+    async def stop(self):
+        for writer in list(self.subscribers):
+            writer.close()
+        self.subscribers.clear()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def _on_subscriber(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.subscribers.add(writer)
+        print(f"Tick subscriber connected. Total subscribers: {len(self.subscribers)}")
+        if self.latest is not None:
+            writer.write(self.latest)
+        try:
+            # Subscribers never send anything; EOF means they went away
+            await reader.read()
+        finally:
+            self.subscribers.discard(writer)
+            writer.close()
+            print(f"Tick subscriber disconnected. Total subscribers: {len(self.subscribers)}")
+
+    def publish(self, payload: bytes):
+        """Queue one message to every subscriber without waiting on any of them"""
+        message = MESSAGE_LENGTH.pack(len(payload)) + payload
+        self.latest = message
+        self.messages_published += 1
+        for writer in list(self.subscribers):
+            if writer.transport.get_write_buffer_size() > MAX_SUBSCRIBER_BUFFER_BYTES:
+                print("Dropping tick subscriber that stopped reading")
+                self.subscribers.discard(writer)
+                self.subscribers_dropped += 1
+                writer.close()
+                continue
+            writer.write(message)
+
+class TickSubscriber:
+    """Web worker side of the broker; reconnects until the publisher is reachable"""
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.connected = False
+        self.messages_received = 0
+
+    async def messages(self) -> AsyncIterator[bytes]:
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path)
+            except (FileNotFoundError, ConnectionRefusedError):
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                continue
+
+            self.connected = True
+            print(f"Subscribed to tick publisher at {self.socket_path}")
+            try:
+                while True:
+                    header = await reader.readexactly(MESSAGE_LENGTH.size)
+                    (length,) = MESSAGE_LENGTH.unpack(header)
+                    payload = await reader.readexactly(length)
+                    self.messages_received += 1
+                    yield payload
+            except (asyncio.IncompleteReadError, ConnectionError):
+                print("Lost tick publisher, reconnecting")
+            finally:
+                self.connected = False
+                writer.close()
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
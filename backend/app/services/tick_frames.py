@@ -0,0 +1,177 @@
+import json
+import struct
+from typing import Callable, Dict, Optional, Tuple, Union
+from app.data.lines import LINE_NAMES, LINE_DIRECTIONS
+from app.services.binary_frames import ALL_LINES_TOPIC, build_dictionary, encode_frame
+from app.services.train_stream import TrainStream
+
+# Topic carrying every line; the other topics are line names
+ALL_TOPIC = "all"
+
+# Frame kinds per topic
+KIND_FULL = "full"
+KIND_STREAM = "stream"      # next delta frame, or a keyframe on keyframe ticks
+KIND_KEYFRAME = "keyframe"
+KIND_BINARY = "binary"
+FRAME_KINDS = (KIND_FULL, KIND_STREAM, KIND_KEYFRAME, KIND_BINARY)
+
+# Topic-less binary id dictionary
+DICTIONARY_KEY = (ALL_TOPIC, "dictionary")
+
+Payload = Union[str, bytes]
+
+def encode_json(data: dict) -> str:
+    """Encode a frame exactly like WebSocket.send_json does"""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+class TickFrames:
+    """
+    Every /ws/trains frame for one tick, keyed by (topic, kind).
+
+    Locally built frames are encoded lazily on first use, so a tick only
+    pays for the frames some client asked for. serialize() encodes them all
+    so a tick publisher can ship the set to web workers in one message.
+    """
+
+    def __init__(
+        self,
+        tick: int,
+        timestamp: str,
+        seqs: Dict[str, int],
+        dictionary_changed: bool,
+        build: Optional[Callable[[str, str], Payload]] = None,
+        payloads: Optional[Dict[Tuple[str, str], Payload]] = None,
+        aliases: Optional[Dict[Tuple[str, str], Tuple[str, str]]] = None
+    ):
+        self.tick = tick
+        self.timestamp = timestamp
+        self.seqs = seqs
+        self.topics = list(seqs)
+        self.dictionary_changed = dictionary_changed
+        self.encodes = 0
+        self._build = build
+        self._payloads: Dict[Tuple[str, str], Payload] = payloads or {}
+        self._aliases = aliases or {}
+
+    def get(self, topic: str, kind: str) -> Payload:
+        key = self._aliases.get((topic, kind), (topic, kind))
+        if key not in self._payloads:
+            self._payloads[key] = self._build(topic, kind)
+            self.encodes += 1
+        return self._payloads[key]
+
+    def dictionary(self) -> str:
+        return self.get(*DICTIONARY_KEY)
+
+    def serialize(self) -> bytes:
+        """
+        Pack every frame into one message.
+
+        Layout: u32 header length, JSON header (tick, timestamp, per-topic seq,
+        aliases and an entry list of [topic, kind, is_binary, length]), then
+        the payloads in entry order.
+        """
+        keys = [(topic, kind) for topic in self.topics for kind in FRAME_KINDS] + [DICTIONARY_KEY]
+        blobs = []
+        entries = []
+        for topic, kind in keys:
+            if (topic, kind) in self._aliases:
+                continue
+            payload = self.get(topic, kind)
+            blob = payload if isinstance(payload, bytes) else payload.encode("utf-8")
+            blobs.append(blob)
+            entries.append([topic, kind, isinstance(payload, bytes), len(blob)])
+
+        header = encode_json({
+            "tick": self.tick,
+            "timestamp": self.timestamp,
+            "seqs": self.seqs,
+            "dictionary_changed": self.dictionary_changed,
+            "entries": entries,
+            "aliases": [[*key, *target] for key, target in self._aliases.items()]
+        }).encode("utf-8")
+        return struct.pack("<I", len(header)) + header + b"".join(blobs)
+
+    @classmethod
+    def deserialize(cls, message: bytes) -> "TickFrames":
+        (header_length,) = struct.unpack_from("<I", message)
+        offset = 4 + header_length
+        header = json.loads(message[4:offset])
+
+        payloads = {}
+        for topic, kind, is_binary, length in header["entries"]:
+            blob = message[offset:offset + length]
+            payloads[(topic, kind)] = blob if is_binary else blob.decode("utf-8")
+            offset += length
+
+        return cls(
+            tick=header["tick"],
+            timestamp=header["timestamp"],
+            seqs=header["seqs"],
+            dictionary_changed=header["dictionary_changed"],
+            payloads=payloads,
+            aliases={(a, b): (c, d) for a, b, c, d in header["aliases"]}
+        )
+
+class FrameBuilder:
+    """Owns the per-topic delta streams and turns each snapshot into TickFrames"""
+
+    def __init__(self):
+        self.streams: Dict[str, TrainStream] = {ALL_TOPIC: TrainStream(ALL_TOPIC)}
+        self._train_ids: Tuple[str, ...] = ()
+
+    def build(self, snapshot) -> TickFrames:
+        topic_trains = {ALL_TOPIC: snapshot.trains, **snapshot.by_line}
+        stream_frames = {}
+        keyframes = {}
+        for topic, trains in topic_trains.items():
+            stream = self.streams.setdefault(topic, TrainStream(topic))
+            stream_frames[topic] = stream.advance(snapshot.tick, snapshot.timestamp, trains)
+            keyframes[topic] = stream.keyframe()
+
+        dictionary_changed = self._train_ids != snapshot.train_ids
+        self._train_ids = snapshot.train_ids
+
+        def build_frame(topic: str, kind: str) -> Payload:
+            if (topic, kind) == DICTIONARY_KEY:
+                return encode_json(build_dictionary(
+                    snapshot.train_ids, snapshot.columns, LINE_NAMES, LINE_DIRECTIONS
+                ))
+
+            seq = frames.seqs[topic]
+            if kind == KIND_BINARY:
+                return encode_frame(
+                    snapshot.columns,
+                    seq,
+                    snapshot.tick,
+                    snapshot.timestamp,
+                    topic=ALL_LINES_TOPIC if topic == ALL_TOPIC else LINE_NAMES.index(topic),
+                    rows=None if topic == ALL_TOPIC else snapshot.line_rows[topic]
+                )
+            if kind == KIND_FULL:
+                trains = topic_trains[topic]
+                return encode_json({
+                    "topic": topic,
+                    "trains": trains,
+                    "timestamp": snapshot.timestamp,
+                    "tick": snapshot.tick,
+                    "seq": seq,
+                    "total_trains": len(trains)
+                })
+            if kind == KIND_KEYFRAME:
+                return encode_json(keyframes[topic])
+            return encode_json(stream_frames[topic])
+
+        frames = TickFrames(
+            tick=snapshot.tick,
+            timestamp=snapshot.timestamp,
+            seqs={topic: self.streams[topic].seq for topic in topic_trains},
+            dictionary_changed=dictionary_changed,
+            build=build_frame,
+            # On keyframe ticks the stream frame already is the keyframe
+            aliases={
+                (topic, KIND_KEYFRAME): (topic, KIND_STREAM)
+                for topic, frame in stream_frames.items() if frame["type"] == "keyframe"
+            }
+        )
+        return frames
@@ -0,0 +1,188 @@
+import numpy as np
+from datetime import datetime
+from typing import List, Dict, Mapping, Optional, Sequence
+
+MOVING = 0
+AT_STATION = 1
+STATUS_NAMES = ("moving", "at_station")
+
+# Keys of a train dict, in the order train_dicts() builds them
+TRAIN_KEYS = (
+    "train_id", "line", "current_position_km", "direction", "status", "speed_kmh",
+    "current_passengers", "capacity", "last_updated", "next_station_id", "next_station_name"
+)
+
+class TrainStateEngine:
+    """
+    Struct-of-arrays train fleet state.
+
+    Every per-train attribute lives in its own NumPy column so a whole
+    fleet advances with a handful of vectorized operations per tick.
+    The list-of-dicts view used by the API is only built by train_dicts(),
+    which to_dicts() calls for the engine's own columns.
+    """
+
+    def __init__(
+        self,
+        line_names: Sequence[str],
+        line_lengths_km: Sequence[float],
+        line_directions: Sequence[Sequence[str]],
+        line_max_speed_kmh: Sequence[int],
+        seed: Optional[int] = None
+    ):
+        self.line_names = list(line_names)
+        self.line_lengths = np.asarray(line_lengths_km, dtype=np.float64)
+        self.line_directions = [tuple(d) for d in line_directions]
+        self.line_max_speed = np.asarray(line_max_speed_kmh, dtype=np.int64)
+        self.rng = np.random.default_rng(seed)
+
+        self.train_ids: List[str] = []
+        self.line_index = np.empty(0, dtype=np.int16)
+        self.position = np.empty(0, dtype=np.float64)
+        self.direction = np.empty(0, dtype=np.int8)
+        self.speed = np.empty(0, dtype=np.int16)
+        self.status = np.empty(0, dtype=np.int8)
+        self.passengers = np.empty(0, dtype=np.int32)
+        self.capacity = np.empty(0, dtype=np.int32)
+        self.last_updated = datetime.now()
+
+    def __len__(self) -> int:
+        return len(self.train_ids)
+
+    def add_trains(
+        self,
+        train_ids: Sequence[str],
+        line_index: Sequence[int],
+        position_km: Sequence[float],
+        direction: Sequence[int],
+        speed_kmh: Sequence[int],
+        status: Sequence[int],
+        passengers: Sequence[int],
+        capacity: Sequence[int]
+    ):
+        """Append trains; direction is +1 (forward) or -1 (backward)"""
+        self.train_ids.extend(train_ids)
+        self.line_index = np.concatenate([self.line_index, np.asarray(line_index, dtype=np.int16)])
+        self.position = np.concatenate([self.position, np.asarray(position_km, dtype=np.float64)])
+        self.direction = np.concatenate([self.direction, np.asarray(direction, dtype=np.int8)])
+        self.speed = np.concatenate([self.speed, np.asarray(speed_kmh, dtype=np.int16)])
+        self.status = np.concatenate([self.status, np.asarray(status, dtype=np.int8)])
+        self.passengers = np.concatenate([self.passengers, np.asarray(passengers, dtype=np.int32)])
+        self.capacity = np.concatenate([self.capacity, np.asarray(capacity, dtype=np.int32)])
+
+    def step(self, now: Optional[datetime] = None):
+        """Advance the whole fleet by one tick"""
+        n = len(self.train_ids)
+        if n == 0:
+            return
+
+        lengths = self.line_lengths[self.line_index]
+        moving = self.status == MOVING
+
+        # Moving trains travel 0.1-0.3 km and wrap to the opposite terminal
+        self.position += self.rng.uniform(0.1, 0.3, n) * self.direction * moving
+        np.copyto(self.position, 0.0, where=self.position > lengths)
+        np.copyto(self.position, lengths, where=self.position < 0)
+
+        # ~5% of trains toggle between moving and dwelling at a station
+        toggle = self.rng.random(n) < 0.05
+        self.status[toggle] ^= 1
+        departing = toggle & (self.status == MOVING)
+        self.speed[toggle] = 0
+        self.speed[departing] = self.rng.integers(
+            30, self.line_max_speed[self.line_index[departing]] + 1
+        )
+
+        self.last_updated = now or datetime.now()
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Read-only snapshot copies of the state columns"""
+        columns = {
+            "line_index": self.line_index.copy(),
+            "position": self.position.copy(),
+            "direction": self.direction.copy(),
+            "speed": self.speed.copy(),
+            "status": self.status.copy(),
+            "passengers": self.passengers.copy(),
+            "capacity": self.capacity.copy()
+        }
+        for column in columns.values():
+            column.setflags(write=False)
+        return columns
+
+    def to_dicts(self) -> List[Dict]:
+        """Build the per-train dict view consumed by routes and WebSocket clients"""
+        return train_dicts(
+            self.train_ids,
+            {"line_index": self.line_index, "position": self.position, "direction": self.direction,
+             "status": self.status, "speed": self.speed, "passengers": self.passengers,
+             "capacity": self.capacity},
+            self.line_names,
+            self.line_directions,
+            self.last_updated.isoformat()
+        )
+
+    @classmethod
+    def synthetic(
+        cls,
+        train_count: int,
+        line_count: int = 50,
+        seed: Optional[int] = None
+    ) -> "TrainStateEngine":
+        """Build a random fleet over a synthetic network, for load and benchmark runs"""
+        rng = np.random.default_rng(seed)
+        engine = cls(
+            line_names=[f"L{i:03d}" for i in range(line_count)],
+            line_lengths_km=rng.uniform(15.0, 60.0, line_count).round(1),
+            line_directions=[(f"L{i:03d}_up", f"L{i:03d}_down") for i in range(line_count)],
+            line_max_speed_kmh=np.full(line_count, 40),
+            seed=seed
+        )
+        line_index = rng.integers(0, line_count, train_count)
+        status = (rng.random(train_count) < 0.3).astype(np.int8)
+        engine.add_trains(
+            train_ids=[f"SX-{i:05d}" for i in range(train_count)],
+            line_index=line_index,
+            position_km=rng.random(train_count) * engine.line_lengths[line_index],
+            direction=np.where(rng.random(train_count) < 0.5, 1, -1),
+            speed_kmh=np.where(status == MOVING, rng.integers(30, 41, train_count), 0),
+            status=status,
+            passengers=rng.integers(100, 300, train_count),
+            capacity=np.full(train_count, 300)
+        )
+        return engine
+
+def train_dicts(
+    train_ids: Sequence[str],
+    columns: Mapping[str, np.ndarray],
+    line_names: Sequence[str],
+    line_directions: Sequence[Sequence[str]],
+    timestamp: str
+) -> List[Dict]:
+    """Per-train dicts from state columns, wherever the columns live"""
+    # Positions are published at metre precision
+    trains = []
+    for train_id, line, position, direction, status, speed, passengers, capacity in zip(
+        train_ids,
+        columns["line_index"].tolist(),
+        columns["position"].round(3).tolist(),
+        columns["direction"].tolist(),
+        columns["status"].tolist(),
+        columns["speed"].tolist(),
+        columns["passengers"].tolist(),
+        columns["capacity"].tolist()
+    ):
+        trains.append({
+            "train_id": train_id,
+            "line": line_names[line],
+            "current_position_km": position,
+            "direction": line_directions[line][0 if direction > 0 else 1],
+            "status": STATUS_NAMES[status],
+            "speed_kmh": speed,
+            "current_passengers": passengers,
+            "capacity": capacity,
+            "last_updated": timestamp,
+            "next_station_id": None,
+            "next_station_name": "Updating..."
+        })
+    return trains
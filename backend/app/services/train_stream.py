@@ -0,0 +1,81 @@
+from typing import Dict, List, Optional, Sequence
+
+# A full keyframe goes out every this many ticks (one minute at 5 s ticks)
+KEYFRAME_INTERVAL = 12
+
+# Sent once per frame instead of once per train
+FRAME_LEVEL_FIELDS = ("last_updated",)
+
+class TrainStream:
+    """
+    Delta-encoded train stream.
+
+    Every advance() gets the next sequence number. Keyframes carry the full
+    train list; delta frames carry only the fields that changed per train
+    since the previous sequence number, so a client applies them in order
+    and resyncs on the next keyframe if it misses one.
+    """
+
+    def __init__(self, topic: str, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.topic = topic
+        self.keyframe_interval = keyframe_interval
+        self.seq = 0
+        self.tick: Optional[int] = None
+        self.timestamp: Optional[str] = None
+        self.trains: Sequence[Dict] = ()
+        self._previous: Dict[str, Dict] = {}
+
+    def advance(self, tick: int, timestamp: str, trains: Sequence[Dict]) -> Dict:
+        """Move to the next sequence number and return its frame"""
+        self.seq += 1
+        self.tick = tick
+        self.timestamp = timestamp
+        self.trains = trains
+
+        if self.seq % self.keyframe_interval == 1 or not self._previous:
+            frame = self.keyframe()
+        else:
+            frame = self._delta()
+
+        self._previous = {t["train_id"]: t for t in trains}
+        return frame
+
+    def keyframe(self) -> Dict:
+        """Full state at the current sequence number"""
+        return {
+            "type": "keyframe",
+            "topic": self.topic,
+            "seq": self.seq,
+            "tick": self.tick,
+            "timestamp": self.timestamp,
+            "total_trains": len(self.trains),
+            "trains": self.trains
+        }
+
+    def _delta(self) -> Dict:
+        changed: List[Dict] = []
+        for train in self.trains:
+            previous = self._previous.get(train["train_id"])
+            if previous is None:
+                changed.append(train)
+                continue
+            fields = {
+                key: value for key, value in train.items()
+                if key not in FRAME_LEVEL_FIELDS and previous.get(key) != value
+            }
+            if fields:
+                fields["train_id"] = train["train_id"]
+                changed.append(fields)
+
+        current_ids = {t["train_id"] for t in self.trains}
+        return {
+            "type": "delta",
+            "topic": self.topic,
+            "seq": self.seq,
+            "base_seq": self.seq - 1,
+            "tick": self.tick,
+            "timestamp": self.timestamp,
+            "total_trains": len(self.trains),
+            "changed": changed,
+            "removed": [train_id for train_id in self._previous if train_id not in current_ids]
+        }
@@ -0,0 +1,51 @@
+"""
+Standalone train simulator for multi-worker deployments.
+
+    python -m app.tick_publisher
+    TICK_MODE=subscriber uvicorn app.main:app --workers 4
+
+This process runs the only simulation. Each tick it writes the fleet state
+into a shared memory block (read by REST handlers in every worker) and then
+publishes the tick's prebuilt WebSocket frames over a Unix domain socket;
+web workers started with TICK_MODE=subscriber fan them out to their clients
+instead of simulating.
+"""
+import asyncio
+import signal
+from app.config import settings
+from app.services.multi_line_train_simulator import multi_line_train_simulator
+from app.services.background_scheduler import TICK_INTERVAL_SECONDS
+from app.services.shared_fleet import SharedFleetWriter
+from app.services.tick_broker import TickPublisher
+from app.services.tick_frames import FrameBuilder
+
+async def run():
+    publisher = TickPublisher(settings.tick_socket_path)
+    builder = FrameBuilder()
+    fleet = SharedFleetWriter(settings.fleet_shm_name, capacity=len(multi_line_train_simulator.engine))
+    await publisher.start()
+
+    loop = asyncio.get_running_loop()
+    # Shut down through the finally block so the socket and shared block are removed
+    loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    next_tick = loop.time()
+    try:
+        while True:
+            snapshot = multi_line_train_simulator.tick()
+            fleet.write(snapshot.tick, snapshot.timestamp, snapshot.train_ids, snapshot.columns)
+            message = builder.build(snapshot).serialize()
+            publisher.publish(message)
+            print(f"Published tick {snapshot.tick}: {len(snapshot.trains)} trains, {len(message)} bytes to {len(publisher.subscribers)} workers")
+
+            # Fixed cadence: a slow tick shortens the next sleep instead of drifting
+            next_tick += TICK_INTERVAL_SECONDS
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+    finally:
+        await publisher.stop()
+        fleet.close()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(run())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("Tick publisher stopped")
@@ -0,0 +1,286 @@
+import re
+import warnings
+import numpy as np
+import orjson
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain
+from typing import Callable, Dict, Iterator, Tuple
+
+# Request columns; a CSV header may name them in any order
+BATCH_COLUMNS = ("source_id", "destination_id", "is_weekend", "use_smart_card")
+
+# Keys of a JSON batch body
+JSON_KEYS = ("pairs", "source_ids", "destination_ids", "is_weekend", "use_smart_card")
+
+# Rows per streamed response chunk
+CHUNK_ROWS = 65536
+
+@dataclass(frozen=True)
+class FarePairs:
+    """Origin-destination pairs with per-pair flags, as aligned NumPy columns"""
+    source_ids: np.ndarray
+    destination_ids: np.ndarray
+    is_weekend: np.ndarray
+    use_smart_card: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.source_ids)
+
+class BatchTooLarge(ValueError):
+    """The batch holds more pairs than the caller allows"""
+
+def _check_size(count: int, max_pairs: int):
+    if count > max_pairs:
+        raise BatchTooLarge(f"At most {max_pairs} pairs per batch")
+
+# One field of a row: station IDs are integers, flags 0/1 or true/false (matched lowercased)
+_ID_FIELD = rb"[ \t]*+-?\d++[ \t]*+"
+_FLAG_FIELD = rb"[ \t]*+(?>[01]|true|false)[ \t]*+"
+_FLAG_COLUMNS = ("is_weekend", "use_smart_card")
+
+@lru_cache(maxsize=None)
+def _row_patterns(columns: Tuple[str, ...]) -> Tuple["re.Pattern[bytes]", "re.Pattern[bytes]"]:
+    """(one row, whole body) patterns for rows holding columns, in order"""
+    row = b",".join(_FLAG_FIELD if name in _FLAG_COLUMNS else _ID_FIELD for name in columns)
+    return re.compile(row), re.compile(rb"(?>" + row + rb"\n)*+" + row)
+
+def _lines(body: bytes) -> bytes:
+    """body with CR and blank lines removed (bytes operations, not a Python loop per line)"""
+    body = body.replace(b"\r", b"").strip()
+    while b"\n\n" in body:
+        body = body.replace(b"\n\n", b"\n")
+    return body
+
+def _numeric_rows(body: bytes, columns: Tuple[str, ...], source: str, max_pairs: int) -> np.ndarray:
+    """
+    (rows, len(columns)) int64 table from lines of comma-separated fields.
+
+    Every field is checked on its own first: an integer in station ID
+    columns, 0/1 or true/false in flag columns, with no empty fields or
+    whitespace inside a field. The checked body is then parsed by NumPy
+    in one pass, not line by line.
+    """
+    rows = body.count(b"\n") + 1
+    _check_size(rows, max_pairs)
+
+    width = len(columns)
+    has_flags = any(name in _FLAG_COLUMNS for name in columns)
+    if has_flags:
+        body = body.lower()
+    row_pattern, body_pattern = _row_patterns(columns)
+    if not body_pattern.fullmatch(body):
+        line = next(i for i, row in enumerate(body.split(b"\n"), 1) if not row_pattern.fullmatch(row))
+        raise ValueError(f"{source} row {line} must hold {width} comma-separated values: "
+                         f"{', '.join(columns)} (integer station IDs, 0/1 or true/false flags)")
+
+    # The words can only be in flag columns now
+    numbers = body.replace(b",", b" ")
+    if has_flags:
+        numbers = numbers.replace(b"true", b"1").replace(b"false", b"0")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            values = np.fromstring(numbers, dtype=np.int64, sep=" ")
+        except (ValueError, DeprecationWarning):
+            raise ValueError(f"{source} station IDs must fit in 64 bits")
+    return values.reshape(rows, width)
+
+def _ids(values) -> np.ndarray:
+    """A list of integers (not bools, floats or strings) as an int64 column"""
+    if isinstance(values, np.ndarray):
+        return values
+    if not isinstance(values, list) or not set(map(type, values)) <= {int}:
+        raise ValueError("Station IDs must be integers")
+    try:
+        return np.asarray(values, dtype=np.int64)
+    except OverflowError:
+        raise ValueError("Station IDs must be integers")
+
+def _flag(value, count: int, name: str) -> np.ndarray:
+    """A boolean or 0/1, or a per-pair list of them, as a bool column"""
+    if value is None:
+        return np.zeros(count, dtype=bool)
+    if isinstance(value, bool) or (type(value) is int and value in (0, 1)):
+        return np.full(count, bool(value))
+
+    if isinstance(value, list) and set(map(type, value)) <= {bool, int}:
+        value = np.asarray(value, dtype=np.int64) if value else np.zeros(0, dtype=np.int64)
+    if not isinstance(value, np.ndarray) or value.shape != (count,) or not ((value == 0) | (value == 1)).all():
+        raise ValueError(f"{name} must be a boolean or a list of {count} booleans (true/false or 0/1)")
+    return value.astype(bool)
+
+def _pairs(source_ids, destination_ids, is_weekend, use_smart_card) -> FarePairs:
+    sources = _ids(source_ids)
+    destinations = _ids(destination_ids)
+    if sources.ndim != 1 or sources.shape != destinations.shape:
+        raise ValueError("source and destination IDs must be lists of the same length")
+    return FarePairs(
+        sources,
+        destinations,
+        _flag(is_weekend, len(sources), "is_weekend"),
+        _flag(use_smart_card, len(sources), "use_smart_card")
+    )
+
+def _empty() -> FarePairs:
+    return _pairs(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), False, False)
+
+def parse_json(body: bytes, max_pairs: int) -> FarePairs:
+    """
+    {"source_ids": [...], "destination_ids": [...]} or {"pairs": [[source, destination], ...]},
+    with is_weekend / use_smart_card as one boolean or a list per pair.
+    """
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e}")
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    unknown = set(data).difference(JSON_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown keys: {', '.join(sorted(unknown))}")
+    if "pairs" in data and ("source_ids" in data or "destination_ids" in data):
+        raise ValueError("Send either pairs or source_ids and destination_ids, not both")
+
+    if "pairs" in data:
+        pairs = data["pairs"]
+        if not isinstance(pairs, list):
+            raise ValueError("pairs must be a list of [source_id, destination_id]")
+        _check_size(len(pairs), max_pairs)
+        try:
+            integers = set(map(type, chain.from_iterable(pairs))) <= {int}
+            table = np.asarray(pairs, dtype=np.int64) if integers else None
+        except (TypeError, ValueError, OverflowError):
+            table = None
+        if not pairs:
+            table = np.empty((0, 2), dtype=np.int64)
+        if table is None or table.ndim != 2 or table.shape[1] != 2:
+            raise ValueError("pairs must be a list of [source_id, destination_id] integer pairs")
+        sources, destinations = table[:, 0], table[:, 1]
+    else:
+        if "source_ids" not in data or "destination_ids" not in data:
+            raise ValueError("Expected pairs, or source_ids and destination_ids")
+        sources, destinations = data["source_ids"], data["destination_ids"]
+        if isinstance(sources, list):
+            _check_size(len(sources), max_pairs)
+    return _pairs(sources, destinations, data.get("is_weekend"), data.get("use_smart_card"))
+
+def parse_csv(body: bytes, max_pairs: int) -> FarePairs:
+    """
+    Rows of source_id,destination_id[,is_weekend,use_smart_card]; flags are 0/1 or true/false.
+
+    An optional header row names the columns.
+    """
+    body = _lines(body)
+    if not body:
+        return _empty()
+    header, _, rest = body.partition(b"\n")
+    columns = [name.strip().decode("utf-8", "replace").lower() for name in header.split(b",")]
+    if all(re.fullmatch(r"[a-z_]+", name) for name in columns):
+        body = rest
+        unknown = set(columns).difference(BATCH_COLUMNS)
+        if unknown or len(set(columns)) != len(columns) or not {"source_id", "destination_id"} <= set(columns):
+            raise ValueError(f"CSV header must name source_id, destination_id and optionally "
+                             f"is_weekend, use_smart_card; got {', '.join(columns)}")
+    elif len(columns) in (2, 4):
+        columns = list(BATCH_COLUMNS[:len(columns)])
+    else:
+        raise ValueError("CSV rows need 2 or 4 columns")
+
+    if not body:
+        return _empty()
+    table = _numeric_rows(body, tuple(columns), "CSV", max_pairs)
+    column = {name: table[:, i] for i, name in enumerate(columns)}
+    return _pairs(column["source_id"], column["destination_id"],
+                  column.get("is_weekend"), column.get("use_smart_card"))
+
+def parse_ndjson(body: bytes, max_pairs: int) -> FarePairs:
+    """
+    One pair per line: {"source_id": .., "destination_id": .., "is_weekend": .., "use_smart_card": ..}
+    or [source_id, destination_id, is_weekend, use_smart_card], flags optional.
+
+    Array lines are parsed numerically like CSV; object lines go through
+    orjson, which is several times slower per pair.
+    """
+    body = _lines(body)
+    if not body:
+        return _empty()
+    rows = body.count(b"\n") + 1
+    _check_size(rows, max_pairs)
+
+    if body.startswith(b"["):
+        width = body.partition(b"\n")[0].count(b",") + 1
+        if width not in (2, 4):
+            raise ValueError("NDJSON arrays need 2 or 4 values")
+        # One [...] per line, and no brackets anywhere else
+        if not (body.endswith(b"]") and body.count(b"[") == body.count(b"]") == rows
+                and body.count(b"\n[") == body.count(b"]\n") == rows - 1):
+            raise ValueError("NDJSON lines must all be pair objects or all [source_id, destination_id, ...] arrays")
+        table = _numeric_rows(body.replace(b"[", b" ").replace(b"]", b" "), BATCH_COLUMNS[:width], "NDJSON", max_pairs)
+        flags = (table[:, 2], table[:, 3]) if width == 4 else (False, False)
+        return _pairs(table[:, 0], table[:, 1], *flags)
+
+    try:
+        records = orjson.loads(b"[" + body.replace(b"\n", b",") + b"]")
+        if set(map(type, records)) <= {dict}:
+            unknown = set(chain.from_iterable(records)).difference(BATCH_COLUMNS)
+            if unknown:
+                raise ValueError(f"Unknown NDJSON keys: {', '.join(sorted(unknown))}")
+        return _pairs(
+            [r["source_id"] for r in records],
+            [r["destination_id"] for r in records],
+            [r.get("is_weekend", False) for r in records],
+            [r.get("use_smart_card", False) for r in records]
+        )
+    except orjson.JSONDecodeError as e:
+        raise ValueError(f"Invalid NDJSON: {e}")
+    except (KeyError, TypeError, AttributeError):
+        raise ValueError("NDJSON lines must all be pair objects or all [source_id, destination_id, ...] arrays")
+
+def _rows(pairs: FarePairs, fares: np.ndarray, start: int, end: int) -> np.ndarray:
+    """(rows, 3) source_id, destination_id, fare table for rows start:end"""
+    return np.column_stack((pairs.source_ids[start:end], pairs.destination_ids[start:end], fares[start:end]))
+
+def stream_json(pairs: FarePairs, fares: np.ndarray) -> Iterator[bytes]:
+    """{"count": n, "fares": [...]}, fares aligned with the request pairs"""
+    yield b'{"count":%d,"fares":[' % len(fares)
+    for start in range(0, len(fares), CHUNK_ROWS):
+        chunk = orjson.dumps(fares[start:start + CHUNK_ROWS], option=orjson.OPT_SERIALIZE_NUMPY)[1:-1]
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]}"
+
+def stream_csv(pairs: FarePairs, fares: np.ndarray) -> Iterator[bytes]:
+    """source_id,destination_id,fare rows, in request order"""
+    yield b"source_id,destination_id,fare\n"
+    for start in range(0, len(fares), CHUNK_ROWS):
+        # Flat [1,2,30,4,5,20] is much faster for orjson than nested rows;
+        # every third comma then becomes a line break: 1,2,30\n4,5,20
+        text = bytearray(orjson.dumps(
+            _rows(pairs, fares, start, start + CHUNK_ROWS).ravel(),
+            option=orjson.OPT_SERIALIZE_NUMPY
+        )[1:-1])
+        characters = np.frombuffer(text, dtype=np.uint8)
+        characters[np.flatnonzero(characters == ord(","))[2::3]] = ord("\n")
+        yield bytes(text) + b"\n"
+
+def stream_ndjson(pairs: FarePairs, fares: np.ndarray) -> Iterator[bytes]:
+    """One [source_id, destination_id, fare] array per line, in request order"""
+    for start in range(0, len(fares), CHUNK_ROWS):
+        rows = orjson.dumps(_rows(pairs, fares, start, start + CHUNK_ROWS), option=orjson.OPT_SERIALIZE_NUMPY)
+        yield rows[1:-1].replace(b"],[", b"]\n[") + b"\n"
+
+# media type -> (parser, response streamer)
+BATCH_FORMATS: Dict[str, Tuple[Callable[[bytes, int], FarePairs], Callable[[FarePairs, np.ndarray], Iterator[bytes]]]] = {
+    "application/json": (parse_json, stream_json),
+    "text/csv": (parse_csv, stream_csv),
+    "application/x-ndjson": (parse_ndjson, stream_ndjson),
+    "application/ndjson": (parse_ndjson, stream_ndjson)
+}
+
+# Upload file extension -> media type, for uploads sent without a specific content type
+BATCH_EXTENSIONS = {
+    ".json": "application/json",
+    ".csv": "text/csv",
+    ".ndjson": "application/x-ndjson",
+    ".jsonl": "application/x-ndjson"
+}
@@ -0,0 +1,77 @@
+from collections import OrderedDict
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+# Distinct (listing, fields) projections kept per ProjectionCache
+MAX_PROJECTIONS = 32
+
+def parse_fields(fields: Optional[str], known: Sequence[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Comma-separated field names as a tuple in record key order, or None for all fields.
+
+    Ordering by the record keys makes "name,id" and "id,name" share one
+    compiled projection. Raises ValueError on unknown names.
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(known)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not requested:
+        raise ValueError("fields must name at least one field")
+    return tuple(name for name in known if name in requested)
+
+@lru_cache(maxsize=MAX_PROJECTIONS)
+def compile_projection(fields: Tuple[str, ...]) -> Callable[[Sequence[Mapping]], List[Dict]]:
+    """A function mapping records to dicts holding only fields"""
+    getter = itemgetter(*fields)
+    if len(fields) == 1:
+        field = fields[0]
+        return lambda records: [{field: getter(record)} for record in records]
+    return lambda records: [dict(zip(fields, getter(record))) for record in records]
+
+def paginate(records: Sequence, limit: Optional[int], cursor: Optional[str]) -> Tuple[Sequence, Optional[str]]:
+    """
+    One page of records and the cursor for the next page (None on the last page).
+
+    Cursors are opaque to clients; they hold the offset of the next record.
+    Raises ValueError on a malformed cursor.
+    """
+    start = 0
+    if cursor is not None:
+        if not cursor.isdigit():
+            raise ValueError(f"Invalid cursor '{cursor}'")
+        start = int(cursor)
+    end = len(records) if limit is None else min(start + limit, len(records))
+    next_cursor = str(end) if end < len(records) else None
+    return records[start:end], next_cursor
+
+class ProjectionCache:
+    """
+    Projected record lists, computed once per data version.
+
+    Entries are keyed by (listing, fields) and rebuilt when the version of
+    their listing changes, so paging through a projection slices one list
+    instead of re-projecting every record per request.
+    """
+
+    def __init__(self, max_entries: int = MAX_PROJECTIONS):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Hashable, Tuple[str, ...]], Tuple[Hashable, List[Dict]]]" = OrderedDict()
+
+    def project(self, listing: Hashable, version: Hashable, records: Sequence[Mapping],
+                fields: Tuple[str, ...]) -> List[Dict]:
+        key = (listing, fields)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        projected = compile_projection(fields)(records)
+        self._entries[key] = (version, projected)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return projected
@@ -0,0 +1,71 @@
+import hashlib
+import orjson
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Clients may keep a copy but must revalidate it with If-None-Match
+CACHE_CONTROL = "no-cache"
+
+# int dict keys become strings and NumPy arrays/scalars are encoded natively
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _encode_default(value: Any) -> Any:
+    """Types orjson does not encode itself (station rows, mapping proxies, models, sets)"""
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def render_json(content: Any) -> bytes:
+    """Encode content to compact UTF-8 JSON in one pass, without jsonable_encoder"""
+    return orjson.dumps(content, default=_encode_default, option=ORJSON_OPTIONS)
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson; the app's default response class.
+
+    Routes whose payload is already plain data (dicts, lists, station rows,
+    NumPy values) can return FastJSONResponse(payload) directly to skip
+    FastAPI's jsonable_encoder walk and response_model re-validation.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (RFC 9110 weak comparison, so W/ prefixes are ignored)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+class PrerenderedResponses:
+    """
+    JSON payloads rendered to bytes once per data version.
+
+    Each payload gets a strong ETag from its content hash; a request whose
+    If-None-Match carries it gets a 304 straight from the cache, without the
+    payload being rebuilt or re-encoded.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[str, bytes, str]] = {}
+
+    def respond(self, request: Request, key: Hashable, version: str, build: Callable[[], Any]) -> Response:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            body = render_json(build())
+            entry = (version, body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+            self._entries[key] = entry
+
+        _, body, etag = entry
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
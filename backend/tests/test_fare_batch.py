@@ -0,0 +1,67 @@
+import pytest
+from app.utils.fare_batch import BatchTooLarge, parse_csv, parse_json, parse_ndjson
+
+MAX_PAIRS = 1000
+
+def pairs_of(parsed):
+    return list(zip(parsed.source_ids.tolist(), parsed.destination_ids.tolist()))
+
+def test_csv_parses_ids_and_flags():
+    parsed = parse_csv(b"1,2,true,0\n 3 , 4 ,FALSE,1\n", MAX_PAIRS)
+    assert pairs_of(parsed) == [(1, 2), (3, 4)]
+    assert parsed.is_weekend.tolist() == [True, False]
+    assert parsed.use_smart_card.tolist() == [False, True]
+
+def test_csv_header_names_columns_in_any_order():
+    parsed = parse_csv(b"is_weekend,destination_id,source_id\ntrue,101,1\n", MAX_PAIRS)
+    assert pairs_of(parsed) == [(1, 101)]
+    assert parsed.is_weekend.tolist() == [True]
+
+@pytest.mark.parametrize("body", [
+    b"1 2,3\n,5",       # space inside a field and an empty field shift values between rows
+    b"1,2\n3 4",
+    b"1,,2",
+    b"1.7,2",
+    b"true,2,1,0",      # flag words only belong in flag columns
+    b"1,2,2,0",
+    b"1,2,4611686018427387904,0",
+])
+def test_csv_rejects_malformed_fields(body):
+    with pytest.raises(ValueError):
+        parse_csv(body, MAX_PAIRS)
+
+@pytest.mark.parametrize("body", [
+    b"[1 2,3]\n[,4]",   # same shift through NDJSON arrays
+    b"[1,101]\n2,5",
+    b"[1,2,yes,0]",
+    b'{"source_id": 1, "destination_id": 2, "weekend": true}',
+    b'{"source_id": 1.7, "destination_id": 2}',
+])
+def test_ndjson_rejects_malformed_lines(body):
+    with pytest.raises(ValueError):
+        parse_ndjson(body, MAX_PAIRS)
+
+def test_ndjson_arrays_and_objects():
+    assert pairs_of(parse_ndjson(b"[1,101,true,false]\n[2,5,0,1]", MAX_PAIRS)) == [(1, 101), (2, 5)]
+    parsed = parse_ndjson(b'{"source_id": 1, "destination_id": 2, "is_weekend": true}', MAX_PAIRS)
+    assert pairs_of(parsed) == [(1, 2)]
+    assert parsed.is_weekend.tolist() == [True]
+
+@pytest.mark.parametrize("body", [
+    b'{"source_ids": [1, 2], "destination_ids": [3, 4], "is_weekend": "false"}',
+    b'{"source_ids": [1.7], "destination_ids": [3]}',
+    b'{"source_ids": [true], "destination_ids": [3]}',
+    b'{"pairs": [[1, 2]], "source_ids": [1], "destination_ids": [2]}',
+    b'{"pairs": [[1, 2]], "weekend": true}',
+])
+def test_json_rejects_malformed_bodies(body):
+    with pytest.raises(ValueError):
+        parse_json(body, MAX_PAIRS)
+
+def test_batches_over_the_limit_are_rejected_while_parsing():
+    with pytest.raises(BatchTooLarge):
+        parse_csv(b"1,2\n3,4\n5,6", 2)
+    with pytest.raises(BatchTooLarge):
+        parse_json(b'{"pairs": [[1, 2], [1, 2], [1, 2]]}', 2)
+    with pytest.raises(BatchTooLarge):
+        parse_ndjson(b"[1,2]\n[1,2]\n[1,2]", 2)
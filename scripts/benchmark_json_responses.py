@@ -0,0 +1,66 @@
+"""
+Compare REST response encoding: FastAPI's default path (jsonable_encoder +
+json.dumps) against the orjson FastJSONResponse, for the /api/stations and
+/api/trains/live payloads.
+
+Synthetic fleets show how /api/trains/live scales past the real 36 trains.
+
+Run from the repository root:
+    python scripts/benchmark_json_responses.py [train_count ...]
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.routes.stations import _all_stations_payload
+from app.services.multi_line_train_simulator import multi_line_train_simulator
+from app.services.train_state import TrainStateEngine
+from app.utils.responses import FastJSONResponse
+
+def time_per_call(func, repeat: int) -> float:
+    """Average milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def trains_payload(trains, timestamp: str, tick: int) -> dict:
+    return {"total_trains": len(trains), "timestamp": timestamp, "tick": tick, "trains": trains}
+
+def compare(name: str, payload: dict, repeat: int):
+    def default_response():
+        return JSONResponse(jsonable_encoder(payload)).body
+
+    def fast_response():
+        return FastJSONResponse(payload).body
+
+    default_body = default_response()
+    fast_body = fast_response()
+    if json.loads(default_body) != json.loads(fast_body):
+        raise SystemExit(f"{name}: encoders disagree")
+
+    default_ms = time_per_call(default_response, repeat)
+    fast_ms = time_per_call(fast_response, repeat)
+    print(f"{name:<28}{len(fast_body):>12,} B | default {default_ms:8.2f} ms | "
+          f"orjson {fast_ms:7.2f} ms | {default_ms / fast_ms:5.1f}x faster"
+          f"{'' if default_body == fast_body else ' (bytes differ)'}")
+
+def main(counts):
+    compare("/api/stations", _all_stations_payload(), repeat=50)
+
+    snapshot = multi_line_train_simulator.get_snapshot()
+    compare("/api/trains/live", trains_payload(snapshot.trains, snapshot.timestamp, snapshot.tick), repeat=200)
+
+    for count in counts:
+        engine = TrainStateEngine.synthetic(count, seed=7)
+        engine.step()
+        payload = trains_payload(engine.to_dicts(), engine.last_updated.isoformat(), 1)
+        compare(f"/api/trains/live ({count:,})", payload, repeat=max(5, 20000 // count))
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000])
@@ -0,0 +1,53 @@
+"""
+Compare /ws/trains frame encodings: bytes per frame and encode time.
+
+Run from the repository root:
+    python scripts/benchmark_ws_frames.py [train_count ...]
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.services.binary_frames import encode_frame
+from app.services.train_state import TrainStateEngine
+
+def time_per_call(func, repeat: int) -> float:
+    """Average milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def benchmark(train_count: int, repeat: int = 20):
+    engine = TrainStateEngine.synthetic(train_count, seed=7)
+    engine.step()
+    trains = engine.to_dicts()
+    columns = engine.columns()
+    timestamp = engine.last_updated.isoformat()
+
+    def json_frame():
+        return json.dumps(
+            {"trains": trains, "timestamp": timestamp, "tick": 1, "seq": 1, "total_trains": len(trains)},
+            separators=(",", ":"),
+            ensure_ascii=False
+        ).encode("utf-8")
+
+    def binary_frame():
+        return encode_frame(columns, 1, 1, timestamp)
+
+    json_bytes = len(json_frame())
+    binary_bytes = len(binary_frame())
+    json_ms = time_per_call(json_frame, repeat)
+    binary_ms = time_per_call(binary_frame, repeat)
+
+    print(f"{train_count:>7} trains | JSON {json_bytes:>10,} B {json_ms:8.2f} ms | "
+          f"binary {binary_bytes:>8,} B {binary_ms:6.2f} ms | "
+          f"{json_bytes / binary_bytes:5.1f}x smaller, {json_ms / binary_ms:6.1f}x faster")
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [36, 1000, 10000]
+    for count in counts:
+        benchmark(count)
@@ -0,0 +1,28 @@
+"""
+Compile the station data modules into the memory-mapped artifact the
+backend loads at startup (backend/app/data/compiled/stations.bin).
+
+Run from the repository root after editing backend/app/data/*_line_stations.py:
+    python scripts/build_station_dataset.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.services.station_dataset import DATASET_PATH, StationDataset, compile_dataset, load_source_stations
+
+def main():
+    stations = load_source_stations()
+    header = compile_dataset(stations, DATASET_PATH)
+
+    # Refuse to ship an artifact that does not round-trip
+    if StationDataset(DATASET_PATH).to_dicts() != stations:
+        DATASET_PATH.unlink()
+        sys.exit("Compiled station dataset does not match the source data")
+
+    print(f"Wrote {DATASET_PATH} ({DATASET_PATH.stat().st_size} bytes): "
+          f"{header['count']} stations, data version {header['data_version']}")
+
+if __name__ == "__main__":
+    main()
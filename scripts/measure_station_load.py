@@ -0,0 +1,79 @@
+"""
+Measure station store load time and memory at startup: compiled artifact vs literal modules.
+
+Each variant runs in a fresh interpreter and times importing
+app.services.station_store, which runs StationStore.load() exactly as app
+startup does. The literal variant hides the artifact so load() takes its
+fallback path. "cold" runs with an empty bytecode cache (first start after
+a deploy), "warm" with a primed one; both caches live in a temporary
+directory, so the source tree is left untouched.
+
+Run from the repository root (build the artifact first):
+    python scripts/measure_station_load.py [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+
+PROBE = """
+import json, time
+def rss_kb():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS"))
+import numpy, hashlib, mmap, importlib.util
+import app.services.station_dataset as station_dataset
+if {hide_artifact}:
+    station_dataset.open_dataset = lambda *args, **kwargs: None
+before = rss_kb()
+start = time.perf_counter()
+from app.services.station_store import station_store
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "rss_kb": rss_kb() - before,
+                   "count": len(station_store), "source": station_store.source}}))
+"""
+
+# name -> (hide the artifact, StationStore.source expected)
+VARIANTS = {
+    "compiled artifact": (False, "compiled"),
+    "literal modules": (True, "literal")
+}
+
+def run(hide_artifact: bool, expected_source: str, cache_dir: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=str(BACKEND), PYTHONPYCACHEPREFIX=cache_dir)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(hide_artifact=hide_artifact)],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output)
+    if result["source"] != expected_source:
+        raise SystemExit(f"StationStore.load() used the {result['source']} path, expected {expected_source}; "
+                         f"run scripts/build_station_dataset.py first")
+    return result
+
+def main(runs: int = 7):
+    print(f"{'variant':<20}{'cache':>6}{'load ms':>10}{'RSS KiB':>10}")
+    with tempfile.TemporaryDirectory(prefix="station-load-warm-") as warm_cache:
+        for cold in (True, False):
+            for name, (hide_artifact, source) in VARIANTS.items():
+                if cold:
+                    results = []
+                    for _ in range(runs):
+                        with tempfile.TemporaryDirectory(prefix="station-load-cold-") as cold_cache:
+                            results.append(run(hide_artifact, source, cold_cache))
+                else:
+                    # Prime the shared bytecode cache once
+                    run(hide_artifact, source, warm_cache)
+                    results = [run(hide_artifact, source, warm_cache) for _ in range(runs)]
+                print(f"{name:<20}{'cold' if cold else 'warm':>6}"
+                      f"{statistics.median(r['ms'] for r in results):>10.2f}"
+                      f"{statistics.median(r['rss_kb'] for r in results):>10.0f}")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))